@@ -0,0 +1,181 @@
+import django
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from ph_geography.index import LEVEL_PROVINCE
+from ph_geography.index import LEVEL_REGION
+from ph_geography.index import get_index
+from ph_geography.index import has_field
+
+APPROXIMATE_COUNT_THRESHOLD = 10000
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator that uses the table statistics of PostgreSQL instead of COUNT(*) for unfiltered querysets
+    of large tables. Falls back to COUNT(*) for filtered querysets, small tables, and other databases.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                # Resolve the table through the search path, not by name alone, which can match tables of other
+                # schemas such as the shadow tables of a table swap
+                cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                               [connection.ops.quote_name(queryset.model._meta.db_table)])
+                row = cursor.fetchone()
+            if row and row[0] >= APPROXIMATE_COUNT_THRESHOLD:
+                return int(row[0])
+        return super(ApproximateCountPaginator, self).count
+
+
+class RegionListFilter(admin.SimpleListFilter):
+    """
+    List filter by region, with choices from the in-memory index.
+    """
+    title = 'Region'
+    parameter_name = 'region'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return [(node.code, node.name) for node in get_index().get_children(LEVEL_REGION, active_only=False)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup: self.value()})
+        return queryset
+
+
+class ProvinceListFilter(admin.SimpleListFilter):
+    """
+    List filter by province, with choices from the in-memory index.
+
+    Choices are narrowed to the provinces of the selected region, if any.
+    """
+    title = 'Province'
+    parameter_name = 'province'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        index = get_index()
+        region = request.GET.get(RegionListFilter.parameter_name)
+        if region:
+            provinces = index.get_children(LEVEL_PROVINCE, region, active_only=False)
+        else:
+            provinces = sorted(index.nodes[LEVEL_PROVINCE].values(), key=lambda node: node.name)
+        return [(node.code, node.name) for node in provinces]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup: self.value()})
+        return queryset
+
+
+def hierarchy_filter(base, lookup):
+    """
+    Returns a subclass of the list filter for the given queryset lookup.
+    """
+    return type(base.__name__, (base,), {'lookup': lookup})
+
+
+class PhilippineGeographyAdmin(admin.ModelAdmin):
+    """
+    Base admin for geography models.
+
+    Searches by exact code and name prefix, and skips the full result count.
+
+    Optional fields are listed in optional_list_display and optional_list_filter, and only shown
+    if not excluded through settings.
+    """
+    list_display = ('code', 'name', 'is_active')
+    list_filter = ('is_active',)
+    optional_list_display = ()
+    optional_list_filter = ()
+    search_fields = ('code', 'name')
+    ordering = ('code',)
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Returns entries with the exact code, or a name starting with the search term.
+
+        Names are stored in upper case, so the search term is matched case-sensitively after converting it
+        to upper case. Unlike the case-insensitive lookups of search_fields, these can use the indexes
+        on code and name.
+        """
+        search_term = search_term.strip()
+        if search_term:
+            queryset = queryset.filter(Q(code=search_term) | Q(name__startswith=search_term.upper()))
+        return queryset, False
+
+    def get_optional_fields(self, names):
+        """
+        Returns a list of the given optional field names that exist in the model.
+        """
+        return [name for name in names if has_field(self.model, name)]
+
+    def get_list_display(self, request):
+        list_display = super(PhilippineGeographyAdmin, self).get_list_display(request)
+        return list(list_display) + self.get_optional_fields(self.optional_list_display)
+
+    def get_list_filter(self, request):
+        list_filter = super(PhilippineGeographyAdmin, self).get_list_filter(request)
+        return list(list_filter) + self.get_optional_fields(self.optional_list_filter)
+
+
+class RegionAdmin(PhilippineGeographyAdmin):
+    list_display = ('code', 'name', 'island_group', 'is_active')
+    list_filter = ('island_group', 'is_active')
+
+
+class ProvinceAdmin(PhilippineGeographyAdmin):
+    list_display = ('code', 'name', 'region', 'is_active')
+    list_filter = (hierarchy_filter(RegionListFilter, 'region__code'), 'is_active')
+    list_select_related = ('region',)
+    if django.VERSION >= (2, 0):
+        autocomplete_fields = ('region',)
+    else:
+        raw_id_fields = ('region',)
+
+
+class MunicipalityAdmin(PhilippineGeographyAdmin):
+    list_display = ('code', 'name', 'province', 'is_active')
+    list_filter = (
+        hierarchy_filter(RegionListFilter, 'province__region__code'),
+        hierarchy_filter(ProvinceListFilter, 'province__code'),
+        'is_active',
+    )
+    optional_list_display = ('is_city',)
+    optional_list_filter = ('is_city',)
+    list_select_related = ('province',)
+    if django.VERSION >= (2, 0):
+        autocomplete_fields = ('province',)
+    else:
+        raw_id_fields = ('province',)
+
+
+class BarangayAdmin(PhilippineGeographyAdmin):
+    list_display = ('code', 'name', 'municipality', 'province', 'is_active')
+    list_filter = (
+        hierarchy_filter(RegionListFilter, 'municipality__province__region__code'),
+        hierarchy_filter(ProvinceListFilter, 'municipality__province__code'),
+        'is_active',
+    )
+    list_select_related = ('municipality__province',)
+    if django.VERSION >= (2, 0):
+        autocomplete_fields = ('municipality',)
+    else:
+        raw_id_fields = ('municipality',)
+
+    def province(self, obj):
+        return obj.municipality.province
+    province.short_description = 'Province'
+    province.admin_order_field = 'municipality__province__name'
+
@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 
 
 class PhGeographyConfig(AppConfig):
     name = 'ph_geography'
     verbose_name = 'Philippine Geography'
+
+    def ready(self):
+        from ph_geography.index import LEVEL_MODELS
+        from ph_geography.index import data_changed
+        from ph_geography.models import PhilippineGeography
+
+        # Keep only the optional fields listed in settings, if provided
+        optional_fields = getattr(settings, 'PH_GEOGRAPHY_OPTIONAL_FIELDS', None)
+        if optional_fields is not None:
+            try:
+                # Columns without null support can only be dropped by migrations of the deployment
+                PhilippineGeography.include_optional_fields(
+                    *optional_fields, allow_not_null=self.label in settings.MIGRATION_MODULES)
+            except (TypeError, ValueError) as e:
+                raise ImproperlyConfigured('PH_GEOGRAPHY_OPTIONAL_FIELDS: {}'.format(e))
+
+        # Discard the in-memory index and bump the shared dataset version whenever geography data changes
+        for model in LEVEL_MODELS.values():
+            post_save.connect(data_changed, sender=model, dispatch_uid='ph_geography_data_changed_save')
+            post_delete.connect(data_changed, sender=model, dispatch_uid='ph_geography_data_changed_delete')
@@ -0,0 +1,221 @@
+import csv
+import json
+
+from ph_geography.index import LEVEL_BARANGAY
+from ph_geography.index import LEVEL_MODELS
+from ph_geography.index import LEVEL_MUNICIPALITY
+from ph_geography.index import LEVEL_PROVINCE
+from ph_geography.index import LEVEL_REGION
+from ph_geography.index import has_field
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMAT_COLUMNAR = 'columnar'
+FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_COLUMNAR)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# (column name, queryset lookup) per level, hierarchy columns are fetched by join
+EXPORT_COLUMNS = {
+    LEVEL_REGION: (
+        ('id', 'id'),
+        ('code', 'code'),
+        ('name', 'name'),
+        ('population', 'population'),
+        ('is_active', 'is_active'),
+        ('island_group', 'island_group'),
+    ),
+    LEVEL_PROVINCE: (
+        ('id', 'id'),
+        ('code', 'code'),
+        ('name', 'name'),
+        ('population', 'population'),
+        ('is_active', 'is_active'),
+        ('income_class', 'income_class'),
+        ('region_code', 'region__code'),
+        ('region_name', 'region__name'),
+        ('island_group', 'region__island_group'),
+    ),
+    LEVEL_MUNICIPALITY: (
+        ('id', 'id'),
+        ('code', 'code'),
+        ('name', 'name'),
+        ('population', 'population'),
+        ('is_active', 'is_active'),
+        ('is_city', 'is_city'),
+        ('is_capital', 'is_capital'),
+        ('city_class', 'city_class'),
+        ('income_class', 'income_class'),
+        ('province_code', 'province__code'),
+        ('province_name', 'province__name'),
+        ('region_code', 'province__region__code'),
+        ('region_name', 'province__region__name'),
+        ('island_group', 'province__region__island_group'),
+    ),
+    LEVEL_BARANGAY: (
+        ('id', 'id'),
+        ('code', 'code'),
+        ('name', 'name'),
+        ('population', 'population'),
+        ('is_active', 'is_active'),
+        ('is_urban', 'is_urban'),
+        ('municipality_code', 'municipality__code'),
+        ('municipality_name', 'municipality__name'),
+        ('province_code', 'municipality__province__code'),
+        ('province_name', 'municipality__province__name'),
+        ('region_code', 'municipality__province__region__code'),
+        ('region_name', 'municipality__province__region__name'),
+        ('island_group', 'municipality__province__region__island_group'),
+    ),
+}
+
+# Lookup of the region and province code per level, None if filter is not applicable
+REGION_LOOKUPS = {
+    LEVEL_REGION: 'code',
+    LEVEL_PROVINCE: 'region__code',
+    LEVEL_MUNICIPALITY: 'province__region__code',
+    LEVEL_BARANGAY: 'municipality__province__region__code',
+}
+PROVINCE_LOOKUPS = {
+    LEVEL_REGION: None,
+    LEVEL_PROVINCE: 'code',
+    LEVEL_MUNICIPALITY: 'province__code',
+    LEVEL_BARANGAY: 'municipality__province__code',
+}
+
+
+def _has_lookup(model, lookup):
+    *relations, name = lookup.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return has_field(model, name)
+
+
+def get_export_columns(level):
+    """
+    Returns a list of (column name, queryset lookup) of the given level.
+
+    Columns of optional fields excluded through settings are left out.
+    """
+    model = LEVEL_MODELS[level]
+    return [(name, lookup) for name, lookup in EXPORT_COLUMNS[level] if _has_lookup(model, lookup)]
+
+
+def get_columns(level):
+    """
+    Returns a list of exported column names of the given level.
+    """
+    return [name for name, _ in get_export_columns(level)]
+
+
+def get_queryset(level, region=None, province=None, is_active=None):
+    """
+    Returns the filtered queryset of the given level.
+
+    Raises ValueError if the level or a filter is not supported.
+    """
+    if level not in EXPORT_COLUMNS:
+        raise ValueError('Unsupported level: {level}'.format(level=level))
+
+    queryset = LEVEL_MODELS[level].objects.all()
+    if region is not None:
+        queryset = queryset.filter(**{REGION_LOOKUPS[level]: region})
+    if province is not None:
+        lookup = PROVINCE_LOOKUPS[level]
+        if lookup is None:
+            raise ValueError('Province filter is not supported for level: {level}'.format(level=level))
+        queryset = queryset.filter(**{lookup: province})
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    return queryset
+
+
+def _iter_chunks(queryset, chunk_size):
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size].iterator())
+        if not chunk:
+            break
+        yield chunk
+        if len(chunk) < chunk_size:
+            break
+        last_id = chunk[-1][0]
+
+
+def iter_chunks(level, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    Returns an iterator of lists of row tuples of the given level, at most chunk_size rows each.
+
+    Rows are fetched with keyset pagination on id, so each query is an indexed range scan
+    and memory use stays constant regardless of the table size.
+
+    Supported filters are region (code), province (code), and is_active.
+    """
+    queryset = get_queryset(level, **filters)
+    lookups = [lookup for _, lookup in get_export_columns(level)]
+    queryset = queryset.order_by('id').values_list(*lookups)
+    return _iter_chunks(queryset, chunk_size)
+
+
+def iter_rows(level, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    Yields row tuples of the given level. See iter_chunks().
+    """
+    for chunk in iter_chunks(level, chunk_size=chunk_size, **filters):
+        for row in chunk:
+            yield row
+
+
+def _write_csv(stream, columns, chunks):
+    writer = csv.writer(stream)
+    writer.writerow(columns)
+    count = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        count += len(chunk)
+    return count
+
+
+def _write_jsonl(stream, columns, chunks):
+    count = 0
+    for chunk in chunks:
+        stream.writelines(
+            json.dumps(dict(zip(columns, row)), separators=(',', ':'), ensure_ascii=False) + '\n'
+            for row in chunk
+        )
+        count += len(chunk)
+    return count
+
+
+def _write_columnar(stream, columns, chunks):
+    count = 0
+    for chunk in chunks:
+        data = dict(zip(columns, (list(values) for values in zip(*chunk))))
+        group = {'count': len(chunk), 'columns': data}
+        stream.write(json.dumps(group, separators=(',', ':'), ensure_ascii=False) + '\n')
+        count += len(chunk)
+    return count
+
+
+WRITERS = {
+    FORMAT_CSV: _write_csv,
+    FORMAT_JSONL: _write_jsonl,
+    FORMAT_COLUMNAR: _write_columnar,
+}
+
+
+def export(level, stream, fmt=FORMAT_CSV, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    Write all rows of the given level to a text stream, one chunk at a time. Returns the number of rows written.
+
+    Supported formats are:
+        * csv - Comma-separated values with a header row.
+        * jsonl - JSON Lines, one object per row.
+        * columnar - JSON Lines, one row group per chunk holding a list of values per column.
+
+    Supported filters are region (code), province (code), and is_active.
+    """
+    if fmt not in WRITERS:
+        raise ValueError('Unsupported format: {fmt}'.format(fmt=fmt))
+    chunks = iter_chunks(level, chunk_size=chunk_size, **filters)
+    return WRITERS[fmt](stream, get_columns(level), chunks)
@@ -0,0 +1,197 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+try:
+    from django.urls import NoReverseMatch
+    from django.urls import reverse
+except ImportError:  # Django < 2.0
+    from django.core.urlresolvers import NoReverseMatch
+    from django.core.urlresolvers import reverse
+
+from ph_geography.index import LEVELS
+from ph_geography.index import LEVEL_BARANGAY
+from ph_geography.index import LEVEL_MODELS
+from ph_geography.index import LEVEL_MUNICIPALITY
+from ph_geography.index import LEVEL_PROVINCE
+from ph_geography.index import LEVEL_REGION
+from ph_geography.index import get_index
+
+CODE_PLACEHOLDER = '__code__'
+
+# URL names of the chained dropdown views per level
+URL_NAMES = {
+    LEVEL_PROVINCE: 'ph_geography:provinces',
+    LEVEL_MUNICIPALITY: 'ph_geography:municipalities',
+    LEVEL_BARANGAY: 'ph_geography:barangays',
+}
+
+
+class GeographySelect(forms.Select):
+    """
+    Select widget for geography choice fields.
+
+    Renders the URL of the chained dropdown view of its level, if ph_geography.urls is included,
+    so the bundled script can reload the options whenever the parent select changes.
+    """
+
+    class Media:
+        js = ('ph_geography/js/cascading-select.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super(GeographySelect, self).get_context(name, value, attrs)
+        widget_attrs = context['widget']['attrs']
+        url_name = URL_NAMES.get(widget_attrs.get('data-ph-geography-level'))
+        if url_name and 'data-ph-geography-url' not in widget_attrs:
+            try:
+                widget_attrs['data-ph-geography-url'] = reverse(url_name, kwargs={'code': CODE_PLACEHOLDER})
+            except NoReverseMatch:
+                pass
+        return context
+
+
+class GeographyChoiceField(forms.ChoiceField):
+    """
+    Choice field for geography entries of a level, backed by the in-memory index.
+
+    Choices are limited to the children of the parent code, so rendering cost does not depend on the size
+    of the dataset. Submitted codes are validated against the index, and the cleaned value is the model instance
+    fetched by primary key.
+
+    Available arguments are:
+        * parent_field - Name of the form field holding the parent entry. Used by CascadingGeographyFormMixin.
+        * parent_code - Code of the parent entry. Ignored for regions.
+        * active_only - Toggle to only accept active entries (True) or all entries (False).
+        * empty_label - Label of the empty choice.
+    """
+    widget = GeographySelect
+    level = None
+    default_error_messages = {
+        'invalid_choice': 'Select a valid choice. That choice is not one of the available choices.',
+    }
+
+    def __init__(self, parent_field=None, parent_code=None, active_only=True, empty_label='---------', **kwargs):
+        super(GeographyChoiceField, self).__init__(**kwargs)
+        self.parent_field = parent_field
+        self.parent_code = parent_code
+        self.active_only = active_only
+        self.empty_label = empty_label
+        self.model = LEVEL_MODELS[self.level]
+        self.widget.attrs['data-ph-geography-level'] = self.level
+        # Evaluate choices lazily, so the index is not built on import
+        self.choices = self.get_choices
+
+    def __deepcopy__(self, memo):
+        result = super(GeographyChoiceField, self).__deepcopy__(memo)
+        result.choices = result.get_choices
+        return result
+
+    def get_choices(self):
+        """
+        Returns a list of choices of the children of the parent code.
+        """
+        nodes = get_index().get_children(self.level, self.parent_code, active_only=self.active_only)
+        return [('', self.empty_label)] + [(node.code, node.name) for node in nodes]
+
+    def get_node(self, code):
+        """
+        Returns the node of the given code, or None if it is not a valid choice.
+        """
+        node = get_index().get(self.level, code)
+        if node is None or (self.active_only and not node.is_active):
+            return None
+        if (self.parent_field or self.parent_code is not None) and node.parent_code != self.parent_code:
+            return None
+        return node
+
+    def prepare_value(self, value):
+        if isinstance(value, self.model):
+            return value.code
+        if isinstance(value, int):
+            node = get_index().get_by_id(self.level, value)
+            return node.code if node else None
+        return value
+
+    def validate(self, value):
+        forms.Field.validate(self, value)
+        if value and self.get_node(value) is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+    def clean(self, value):
+        code = super(GeographyChoiceField, self).clean(value)
+        if code in self.empty_values:
+            return None
+        try:
+            return self.model._default_manager.get(pk=self.get_node(code).id)
+        except self.model.DoesNotExist:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+    def has_changed(self, initial, data):
+        if self.disabled:
+            return False
+        return (self.prepare_value(initial) or '') != (data or '')
+
+
+class RegionChoiceField(GeographyChoiceField):
+    level = LEVEL_REGION
+
+
+class ProvinceChoiceField(GeographyChoiceField):
+    level = LEVEL_PROVINCE
+
+
+class MunicipalityChoiceField(GeographyChoiceField):
+    level = LEVEL_MUNICIPALITY
+
+
+class BarangayChoiceField(GeographyChoiceField):
+    level = LEVEL_BARANGAY
+
+
+class CascadingGeographyFormMixin(object):
+    """
+    Form mixin linking geography choice fields to their parent fields.
+
+    Each field with parent_field set only offers the children of the submitted (or initial) parent value.
+    Missing initial values of parent fields are filled in from the initial values of their children,
+    so editing an instance with only a barangay selects its municipality, province, and region.
+    Fields without parent_field offer the siblings of their own value.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CascadingGeographyFormMixin, self).__init__(*args, **kwargs)
+        index = get_index()
+        fields = dict((name, field) for name, field in self.fields.items() if isinstance(field, GeographyChoiceField))
+
+        # Deepest level first, so initial values propagate up the whole hierarchy
+        for name in sorted(fields, key=lambda name: LEVELS.index(fields[name].level), reverse=True):
+            field = fields[name]
+            parent = field.parent_field
+            if parent not in fields or self.get_geography_initial(parent):
+                continue
+            node = index.get(field.level, self.get_geography_initial(name))
+            if node is not None:
+                self.initial[parent] = node.parent_code
+
+        for name, field in fields.items():
+            if field.parent_field:
+                field.parent_code = self.get_geography_value(field.parent_field)
+                field.widget.attrs['data-ph-geography-parent'] = self[field.parent_field].auto_id
+            elif field.level != LEVEL_REGION and field.parent_code is None:
+                node = index.get(field.level, self.get_geography_value(name))
+                if node is not None:
+                    field.parent_code = node.parent_code
+
+    def get_geography_initial(self, name):
+        """
+        Returns the initial code of the field.
+        """
+        field = self.fields[name]
+        return field.prepare_value(self.initial.get(name, field.initial)) or None
+
+    def get_geography_value(self, name):
+        """
+        Returns the submitted code of the field if the form is bound, otherwise the initial code.
+        """
+        if self.is_bound:
+            return self.data.get(self.add_prefix(name)) or None
+        return self.get_geography_initial(name)
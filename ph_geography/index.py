@@ -0,0 +1,234 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS
+from django.db import IntegrityError
+from django.db import connections
+from django.db import transaction
+
+from ph_geography.models import Barangay
+from ph_geography.models import DatasetVersion
+from ph_geography.models import Municipality
+from ph_geography.models import Province
+from ph_geography.models import Region
+
+LEVEL_REGION = 'region'
+LEVEL_PROVINCE = 'province'
+LEVEL_MUNICIPALITY = 'municipality'
+LEVEL_BARANGAY = 'barangay'
+LEVELS = (LEVEL_REGION, LEVEL_PROVINCE, LEVEL_MUNICIPALITY, LEVEL_BARANGAY)
+
+LEVEL_MODELS = {
+    LEVEL_REGION: Region,
+    LEVEL_PROVINCE: Province,
+    LEVEL_MUNICIPALITY: Municipality,
+    LEVEL_BARANGAY: Barangay,
+}
+
+LEVEL_PARENTS = {
+    LEVEL_REGION: None,
+    LEVEL_PROVINCE: LEVEL_REGION,
+    LEVEL_MUNICIPALITY: LEVEL_PROVINCE,
+    LEVEL_BARANGAY: LEVEL_MUNICIPALITY,
+}
+
+# Seconds an index is reused before checking the shared dataset version again
+VERSION_CHECK_INTERVAL = getattr(settings, 'PH_GEOGRAPHY_VERSION_CHECK_INTERVAL', 5)
+DATASET_VERSION_ID = 1
+
+Node = namedtuple('Node', ('id', 'code', 'name', 'is_active', 'parent_code', 'latitude', 'longitude'))
+
+_index = None
+_lock = threading.Lock()
+_bump_callbacks = {}
+
+
+def has_field(model, name):
+    """
+    Returns True if the model has a field of the given name.
+    """
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class GeographyIndex(object):
+    """
+    In-memory lookup structure for all geography levels.
+
+    Built from a single query per level, the index maps codes to nodes and parent codes to their children,
+    so lookups and cascading selects never touch the database.
+
+    Available attributes are:
+        * nodes - Mapping of level to {code: Node}.
+        * ids - Mapping of level to {id: Node}.
+        * children - Mapping of level to {parent code: [Node, ...]}, ordered by name.
+                     Regions are stored under parent code None.
+        * version - Digest of the indexed data. Changes whenever any indexed value changes.
+        * dataset_version - Shared dataset version the index was built from.
+        * checked_at - Time the shared dataset version was last checked.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.ids = {}
+        self.children = {}
+        self._json = {}
+        # Read before the data, so changes made while building are picked up by the next check
+        self.dataset_version = get_dataset_version()
+        self.checked_at = time.time()
+
+        digest = hashlib.sha1()
+        for level in LEVELS:
+            parent = LEVEL_PARENTS[level]
+            model = LEVEL_MODELS[level]
+            columns = ['id', 'code', 'name', 'is_active']
+            # Centroid fields may be excluded through settings
+            has_centroid = has_field(model, 'latitude') and has_field(model, 'longitude')
+            if has_centroid:
+                columns.extend(['latitude', 'longitude'])
+            if parent:
+                columns.append('{parent}__code'.format(parent=parent))
+            queryset = model.objects.order_by('name', 'code').values_list(*columns)
+
+            nodes = {}
+            ids = {}
+            children = {}
+            for row in queryset:
+                parent_code = row[-1] if parent else None
+                latitude, longitude = row[4:6] if has_centroid else (None, None)
+                node = Node(row[0], row[1], row[2], row[3], parent_code, latitude, longitude)
+                nodes[node.code] = node
+                ids[node.id] = node
+                children.setdefault(node.parent_code, []).append(node)
+                digest.update(repr((level,) + tuple(node)).encode('utf-8'))
+
+            self.nodes[level] = nodes
+            self.ids[level] = ids
+            self.children[level] = children
+
+        self.version = digest.hexdigest()[:20]
+
+    def get(self, level, code):
+        """
+        Returns the node of the given level and code, or None if not found.
+        """
+        return self.nodes[level].get(code)
+
+    def get_by_id(self, level, pk):
+        """
+        Returns the node of the given level and id, or None if not found.
+        """
+        return self.ids[level].get(pk)
+
+    def get_children(self, level, parent_code=None, active_only=True):
+        """
+        Returns a list of nodes of the given level under the parent code.
+
+        Use parent code None to get all regions.
+        """
+        children = self.children[level].get(parent_code, [])
+        if active_only:
+            children = [node for node in children if node.is_active]
+        return children
+
+    def children_json(self, level, parent_code=None):
+        """
+        Returns compact JSON bytes of the active children of the given level under the parent code.
+
+        Payloads are built once per index and reused afterwards.
+        """
+        key = (level, parent_code)
+        payload = self._json.get(key)
+        if payload is None:
+            results = [{'code': node.code, 'name': node.name} for node in self.get_children(level, parent_code)]
+            payload = json.dumps({'results': results}, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            self._json[key] = payload
+        return payload
+
+
+def get_dataset_version(using=DEFAULT_DB_ALIAS):
+    """
+    Returns the token of the shared dataset version, or None if it was never bumped.
+    """
+    return DatasetVersion.objects.using(using).filter(pk=DATASET_VERSION_ID).values_list('token', flat=True).first()
+
+
+def bump_dataset_version(using=DEFAULT_DB_ALIAS):
+    """
+    Replace the shared dataset version and discard the GeographyIndex of this process.
+
+    Indexes of other processes are rebuilt once they notice the new version, within VERSION_CHECK_INTERVAL seconds.
+    Call after changing geography data without model signals, e.g. through queryset updates or raw SQL.
+    """
+    token = uuid.uuid4().hex
+    queryset = DatasetVersion.objects.using(using).filter(pk=DATASET_VERSION_ID)
+    if not queryset.update(token=token):
+        try:
+            with transaction.atomic(using=using):
+                DatasetVersion.objects.using(using).create(pk=DATASET_VERSION_ID, token=token)
+        except IntegrityError:
+            queryset.update(token=token)
+    clear_index()
+
+
+def data_changed(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Signal receiver of geography model changes.
+
+    Discards the GeographyIndex of this process right away, and bumps the shared dataset version
+    once the current transaction commits. Bulk loads such as loaddata only bump it once.
+    """
+    clear_index()
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        bump_dataset_version(using)
+        return
+    # Transactions discard their commit hooks on rollback, so a pending bump is found among them
+    callback = _bump_callbacks.setdefault(using, lambda: bump_dataset_version(using))
+    if not any(hook[1] is callback for hook in connection.run_on_commit):
+        transaction.on_commit(callback, using=using)
+
+
+def _is_outdated(index):
+    now = time.time()
+    if now < index.checked_at + VERSION_CHECK_INTERVAL:
+        return False
+    if get_dataset_version() != index.dataset_version:
+        return True
+    index.checked_at = now
+    return False
+
+
+def get_index():
+    """
+    Returns the shared GeographyIndex, building it on first use.
+
+    The index is rebuilt when the shared dataset version changes, checked at most every VERSION_CHECK_INTERVAL seconds.
+    """
+    global _index
+    index = _index
+    if index is None or _is_outdated(index):
+        with _lock:
+            if _index is index or _index is None:
+                _index = GeographyIndex()
+            index = _index
+    return index
+
+
+def clear_index(*args, **kwargs):
+    """
+    Discard the shared GeographyIndex. It will be rebuilt on next use.
+
+    Accepts any arguments so it can be connected directly to model signals.
+    """
+    global _index
+    _index = None
@@ -0,0 +1,432 @@
+import io
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core import management
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS
+from django.db import IntegrityError
+from django.db import OperationalError
+from django.db import connections
+from django.db import transaction
+from django.db.migrations.loader import MigrationLoader
+
+from ph_geography.index import LEVELS
+from ph_geography.index import LEVEL_MODELS
+from ph_geography.index import bump_dataset_version
+
+APP_NAME = 'ph_geography'
+LOCK_NAME = 'ph_geography_load'
+LOCK_TABLE = 'ph_geography_lock'
+LOCK_ID = zlib.crc32(LOCK_NAME.encode('utf-8'))
+LOCK_POLL_INTERVAL = 0.5
+# Lock table rows are refreshed by their holder every LOCK_HEARTBEAT_INTERVAL seconds,
+# and taken over once not refreshed for LOCK_STALE_AFTER seconds
+LOCK_HEARTBEAT_INTERVAL = 10
+LOCK_STALE_AFTER = 60
+BATCH_SIZE = 1000
+# Milliseconds the table swap waits for table locks, attempts, and seconds between attempts
+SWAP_LOCK_TIMEOUT = 2000
+SWAP_ATTEMPTS = 10
+SWAP_RETRY_INTERVAL = 1
+# PostgreSQL error code of lock timeouts
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+class LoadError(Exception):
+    """
+    Raised when geography data cannot be loaded safely.
+    """
+
+
+def _acquire_postgresql(cursor, timeout):
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [LOCK_ID])
+        if cursor.fetchone()[0]:
+            return True
+        if deadline is not None and time.time() >= deadline:
+            return False
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def _acquire_mysql(cursor, timeout):
+    cursor.execute('SELECT GET_LOCK(%s, %s)', [LOCK_NAME, -1 if timeout is None else timeout])
+    return cursor.fetchone()[0] == 1
+
+
+def _acquire_lock_table(connection, timeout, holder):
+    table = connection.ops.quote_name(LOCK_TABLE)
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS {table} (name varchar(100) PRIMARY KEY, '
+                       'holder varchar(100) NOT NULL, acquired_at real NOT NULL)'.format(table=table))
+
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                # Take over locks of holders that stopped sending heartbeats
+                cursor.execute('DELETE FROM {table} WHERE name = %s AND acquired_at < %s'.format(table=table),
+                               [LOCK_NAME, time.time() - LOCK_STALE_AFTER])
+                cursor.execute('INSERT INTO {table} (name, holder, acquired_at) VALUES (%s, %s, %s)'.format(
+                    table=table), [LOCK_NAME, holder, time.time()])
+            return True
+        except IntegrityError:
+            # Lock held by another process
+            pass
+        except OperationalError as e:
+            # Lock table busy ("database is locked"), other errors are not contention
+            if 'locked' not in str(e):
+                raise
+        if deadline is not None and time.time() >= deadline:
+            return False
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+class LockHeartbeat(threading.Thread):
+    """
+    Thread refreshing a lock table row every LOCK_HEARTBEAT_INTERVAL seconds, so it is not taken over
+    while its holder is alive. Uses its own database connection.
+    """
+
+    def __init__(self, using, holder):
+        super(LockHeartbeat, self).__init__(name='ph_geography_lock_heartbeat')
+        self.daemon = True
+        self.using = using
+        self.holder = holder
+        self.stopped = threading.Event()
+
+    def beat(self):
+        connection = connections[self.using]
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE {table} SET acquired_at = %s WHERE name = %s AND holder = %s'.format(
+                table=connection.ops.quote_name(LOCK_TABLE)), [time.time(), LOCK_NAME, self.holder])
+
+    def run(self):
+        try:
+            while not self.stopped.wait(LOCK_HEARTBEAT_INTERVAL):
+                try:
+                    self.beat()
+                except OperationalError:
+                    # Lock table busy, try again on the next heartbeat
+                    pass
+        finally:
+            connections[self.using].close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+@contextmanager
+def load_lock(using=DEFAULT_DB_ALIAS, timeout=None):
+    """
+    Context manager holding a database-wide lock for loading geography data.
+
+    Uses advisory locks on PostgreSQL and MySQL, and a lock table on other databases. Lock table rows record
+    their holder and are refreshed by a heartbeat thread, so only locks of crashed holders are taken over.
+    Waits for the lock up to timeout seconds (forever if None), then raises LoadError.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block:
+        raise LoadError('The load lock cannot be taken inside a transaction.')
+
+    vendor = connection.vendor
+    heartbeat = None
+    if vendor in ('postgresql', 'mysql'):
+        with connection.cursor() as cursor:
+            acquire = _acquire_postgresql if vendor == 'postgresql' else _acquire_mysql
+            acquired = acquire(cursor, timeout)
+    else:
+        holder = '{host}:{pid}:{token}'.format(host=socket.gethostname()[:60], pid=os.getpid(),
+                                               token=uuid.uuid4().hex[:8])
+        acquired = _acquire_lock_table(connection, timeout, holder)
+        if acquired:
+            heartbeat = LockHeartbeat(using, holder)
+            heartbeat.start()
+    if not acquired:
+        raise LoadError('Timed out waiting for the load lock.')
+
+    try:
+        yield
+    finally:
+        if heartbeat is not None:
+            heartbeat.stop()
+        with connection.cursor() as cursor:
+            if vendor == 'postgresql':
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [LOCK_ID])
+            elif vendor == 'mysql':
+                cursor.execute('SELECT RELEASE_LOCK(%s)', [LOCK_NAME])
+            else:
+                table = connection.ops.quote_name(LOCK_TABLE)
+                cursor.execute('DELETE FROM {table} WHERE name = %s AND holder = %s'.format(table=table),
+                               [LOCK_NAME, holder])
+
+
+def get_fixture_path(fixture):
+    """
+    Returns the path of a fixture file of the app, or the given path if absolute.
+    """
+    path = fixture if os.path.isabs(fixture) else os.path.join(apps.get_app_config(APP_NAME).path, 'fixtures', fixture)
+    if not os.path.isfile(path):
+        raise LoadError('No fixture named "{fixture}" found.'.format(fixture=fixture))
+    return path
+
+
+def load_atomic(fixtures, using=DEFAULT_DB_ALIAS):
+    """
+    Load fixtures in a single transaction, so readers never see partially loaded data.
+    """
+    paths = [get_fixture_path(fixture) for fixture in fixtures]
+    with transaction.atomic(using=using):
+        for path in paths:
+            management.call_command('loaddata', path, database=using, ignorenonexistent=True, verbosity=0)
+
+
+def get_migration_models(using=DEFAULT_DB_ALIAS):
+    """
+    Returns a mapping of level to the geography model as of the latest migration of the app.
+
+    Unlike the runtime models, these match the live tables even if fields were removed through settings.
+    The models live in an isolated app registry, so their foreign keys point to each other.
+    Raises LoadError if the app has no migrations, or not all of them are applied.
+    """
+    loader = MigrationLoader(connections[using])
+    leaf_nodes = [node for node in loader.graph.leaf_nodes() if node[0] == APP_NAME]
+    if len(leaf_nodes) != 1 or leaf_nodes[0] not in loader.applied_migrations:
+        raise LoadError('All migrations of {app} must be applied.'.format(app=APP_NAME))
+    state_apps = loader.project_state(leaf_nodes[0]).apps
+    return dict((level, state_apps.get_model(APP_NAME, LEVEL_MODELS[level]._meta.model_name)) for level in LEVELS)
+
+
+def get_external_references(connection, tables):
+    """
+    Returns a list of foreign keys of tables outside the given tables to them. PostgreSQL only.
+
+    Foreign keys are dicts of:
+        * name - Constraint name.
+        * table - Quoted name of the referencing table, including its schema.
+        * column - Referencing column.
+        * referenced_table - Referenced table.
+        * referenced_column - Referenced column.
+        * definition - Constraint definition.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.conname, quote_ident(src_schema.nspname) || '.' || quote_ident(src.relname), "
+            'src_column.attname, dst.relname, dst_column.attname, pg_get_constraintdef(c.oid) FROM pg_constraint c '
+            'JOIN pg_class src ON src.oid = c.conrelid '
+            'JOIN pg_namespace src_schema ON src_schema.oid = src.relnamespace '
+            'JOIN pg_class dst ON dst.oid = c.confrelid '
+            'JOIN pg_namespace dst_schema ON dst_schema.oid = dst.relnamespace '
+            'JOIN pg_attribute src_column ON src_column.attrelid = c.conrelid AND src_column.attnum = c.conkey[1] '
+            'JOIN pg_attribute dst_column ON dst_column.attrelid = c.confrelid AND dst_column.attnum = c.confkey[1] '
+            "WHERE c.contype = 'f' AND dst_schema.nspname = current_schema() AND dst.relname = ANY(%s) "
+            'AND NOT (src.relnamespace = dst.relnamespace AND src.relname = ANY(%s)) '
+            'ORDER BY 2, 1',
+            [list(tables), list(tables)]
+        )
+        keys = ('name', 'table', 'column', 'referenced_table', 'referenced_column', 'definition')
+        return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+
+def _read_fixture_rows(fixtures, models):
+    """
+    Yields (level, model instance) of fixture entries, with values of fields missing from an entry
+    set to the field default.
+    """
+    levels = dict((model._meta.label_lower, level) for level, model in models.items())
+    for fixture in fixtures:
+        with io.open(get_fixture_path(fixture), 'rt', encoding='utf-8') as f:
+            try:
+                entries = json.load(f)
+            except ValueError as e:
+                raise LoadError('Invalid fixture "{fixture}": {error}'.format(fixture=fixture, error=e))
+        for entry in entries:
+            level = levels.get(entry.get('model'))
+            if level is None:
+                raise LoadError('Unsupported model in fixture "{fixture}": {model}'.format(
+                    fixture=fixture, model=entry.get('model')))
+            model = models[level]
+            values = entry.get('fields', {})
+            obj = model(pk=entry['pk'])
+            for field in model._meta.concrete_fields:
+                if field.primary_key:
+                    continue
+                if field.name in values:
+                    value = values[field.name]
+                    setattr(obj, field.attname, value if field.is_relation else field.to_python(value))
+                else:
+                    setattr(obj, field.attname, field.get_default())
+            yield level, obj
+
+
+def _create_shadow_tables(fixtures, models, connection, schema, live_schema, references):
+    """
+    Create the geography tables in the shadow schema, fill them from the fixtures, and validate them.
+    """
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute('CREATE SCHEMA {}'.format(quote(schema)))
+        # Create tables, constraints, indexes, and sequences under the names the migrations would give them
+        cursor.execute('SET LOCAL search_path TO {}'.format(quote(schema)))
+        with connection.schema_editor() as schema_editor:
+            for level in LEVELS:
+                schema_editor.create_model(models[level])
+
+        batches = dict((level, []) for level in LEVELS)
+        for level, obj in _read_fixture_rows(fixtures, models):
+            batch = batches[level]
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                models[level]._default_manager.using(connection.alias).bulk_create(batch)
+                del batch[:]
+        for level, batch in batches.items():
+            if batch:
+                models[level]._default_manager.using(connection.alias).bulk_create(batch)
+        for sql in connection.ops.sequence_reset_sql(no_style(), [models[level] for level in LEVELS]):
+            cursor.execute(sql)
+        # Check the foreign keys between shadow tables now instead of on commit
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        # Refuse to replace live tables with fewer entries, e.g. from incomplete or truncated fixtures
+        for level in LEVELS:
+            table = models[level]._meta.db_table
+            cursor.execute('SELECT (SELECT COUNT(*) FROM {shadow}), (SELECT COUNT(*) FROM {live})'.format(
+                shadow=quote(table), live='{}.{}'.format(quote(live_schema), quote(table))))
+            shadow_count, live_count = cursor.fetchone()
+            if not shadow_count:
+                raise LoadError('No {level} entries found in fixtures.'.format(level=level))
+            if shadow_count < live_count:
+                raise LoadError('Fixtures have fewer {level} entries ({shadow}) than the live table ({live}).'.format(
+                    level=level, shadow=shadow_count, live=live_count))
+
+        # Refuse to swap if rows of other tables reference entries missing from the fixtures
+        for reference in references:
+            cursor.execute(
+                'SELECT COUNT(*) FROM {table} src WHERE src.{column} IS NOT NULL AND NOT EXISTS '
+                '(SELECT 1 FROM {referenced_table} dst WHERE dst.{referenced_column} = src.{column})'.format(
+                    table=reference['table'], column=quote(reference['column']),
+                    referenced_table=quote(reference['referenced_table']),
+                    referenced_column=quote(reference['referenced_column'])))
+            missing = cursor.fetchone()[0]
+            if missing:
+                raise LoadError('{count} rows of {table} reference {referenced_table} entries missing from '
+                                'fixtures.'.format(count=missing, table=reference['table'],
+                                                   referenced_table=reference['referenced_table']))
+
+
+def _swap_tables(connection, tables, schema, live_schema, old_schema, references):
+    """
+    Move the live tables out of the way and the shadow tables in, re-pointing foreign keys of other tables.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL lock_timeout = {:d}'.format(SWAP_LOCK_TIMEOUT))
+        for reference in references:
+            cursor.execute('ALTER TABLE {table} DROP CONSTRAINT {name}'.format(
+                table=reference['table'], name=quote(reference['name'])))
+        cursor.execute('CREATE SCHEMA {}'.format(quote(old_schema)))
+        # Moving tables keeps their names, and takes their indexes, constraints, and sequences along
+        for table in tables:
+            cursor.execute('ALTER TABLE {}.{} SET SCHEMA {}'.format(
+                quote(live_schema), quote(table), quote(old_schema)))
+            cursor.execute('ALTER TABLE {}.{} SET SCHEMA {}'.format(
+                quote(schema), quote(table), quote(live_schema)))
+        # Existing rows are validated after the swap, without blocking writes
+        for reference in references:
+            cursor.execute('ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID'.format(
+                table=reference['table'], name=quote(reference['name']), definition=reference['definition']))
+        for table in reversed(tables):
+            cursor.execute('DROP TABLE {}.{}'.format(quote(old_schema), quote(table)))
+        cursor.execute('DROP SCHEMA {}'.format(quote(old_schema)))
+        cursor.execute('DROP SCHEMA {}'.format(quote(schema)))
+
+
+def _is_lock_timeout(error):
+    return getattr(error.__cause__, 'pgcode', None) == LOCK_NOT_AVAILABLE
+
+
+def load_swap(fixtures, using=DEFAULT_DB_ALIAS):
+    """
+    Load fixtures into shadow tables, validate them, and swap them with the live tables in a single transaction.
+
+    Shadow tables are created from the migration state of the app in a separate schema, so they match
+    the live tables down to the names of their constraints, indexes, and sequences.
+    They are refused if any level has no entries, fewer entries than its live table, or entries
+    referenced by other tables missing. Foreign keys of other tables are re-pointed to the new tables.
+
+    Readers keep reading the live tables until the swap. The swap waits up to SWAP_LOCK_TIMEOUT milliseconds
+    for table locks, so it does not queue up other queries behind it, and is retried up to SWAP_ATTEMPTS times.
+    PostgreSQL only.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        raise LoadError('Table swap is only supported on PostgreSQL.')
+
+    for fixture in fixtures:
+        get_fixture_path(fixture)
+    models = get_migration_models(using)
+    tables = [models[level]._meta.db_table for level in LEVELS]
+    suffix = int(time.time())
+    schema = '{app}_shadow_{suffix}'.format(app=APP_NAME, suffix=suffix)
+    old_schema = '{app}_old_{suffix}'.format(app=APP_NAME, suffix=suffix)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT current_schema()')
+        live_schema = cursor.fetchone()[0]
+    references = get_external_references(connection, tables)
+
+    try:
+        _create_shadow_tables(fixtures, models, connection, schema, live_schema, references)
+    except IntegrityError as e:
+        raise LoadError('Invalid entries in fixtures: {error}'.format(error=e))
+
+    swapped = False
+    try:
+        for attempt in range(1, SWAP_ATTEMPTS + 1):
+            try:
+                with transaction.atomic(using=using):
+                    _swap_tables(connection, tables, schema, live_schema, old_schema, references)
+            except OperationalError as e:
+                if not _is_lock_timeout(e):
+                    raise
+                if attempt == SWAP_ATTEMPTS:
+                    raise LoadError('Timed out waiting for table locks to swap tables.')
+                time.sleep(SWAP_RETRY_INTERVAL)
+            else:
+                swapped = True
+                break
+    finally:
+        if not swapped:
+            with connection.cursor() as cursor:
+                cursor.execute('DROP SCHEMA {} CASCADE'.format(connection.ops.quote_name(schema)))
+
+    for reference in references:
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute('ALTER TABLE {table} VALIDATE CONSTRAINT {name}'.format(
+                    table=reference['table'], name=connection.ops.quote_name(reference['name'])))
+        except IntegrityError:
+            raise LoadError('Rows of {table} reference missing entries, constraint {name} is left NOT VALID.'.format(
+                table=reference['table'], name=reference['name']))
+
+
+def load_fixtures(fixtures, using=DEFAULT_DB_ALIAS, swap=False, lock_timeout=None):
+    """
+    Load fixtures while holding the load lock, so concurrent loads wait for each other.
+
+    Loads in a single transaction by default, or through shadow tables and a table swap if swap is True.
+    """
+    with load_lock(using=using, timeout=lock_timeout):
+        if swap:
+            load_swap(fixtures, using=using)
+        else:
+            load_atomic(fixtures, using=using)
+    bump_dataset_version(using)
@@ -0,0 +1,56 @@
+import csv
+import io
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+
+from ph_geography.index import LEVEL_MODELS
+from ph_geography.index import bump_dataset_version
+
+
+class Command(BaseCommand):
+    help = 'Load PH Geography centroid coordinates from a CSV file with columns: level, code, latitude, longitude.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the CSV file.')
+
+    def read_rows(self, path):
+        try:
+            f = io.open(path, 'rt', encoding='utf-8', newline='')
+        except (IOError, OSError) as e:
+            raise CommandError('Cannot read file "{path}": {error}'.format(path=path, error=e))
+        with f:
+            reader = csv.DictReader(f)
+            missing = {'level', 'code', 'latitude', 'longitude'}.difference(reader.fieldnames or [])
+            if missing:
+                raise CommandError('Missing columns: {}'.format(', '.join(sorted(missing))))
+            for line, row in enumerate(reader, start=2):
+                if row['level'] not in LEVEL_MODELS:
+                    raise CommandError('Unsupported level on line {}: {}'.format(line, row['level']))
+                try:
+                    latitude = float(row['latitude']) if row['latitude'] else None
+                    longitude = float(row['longitude']) if row['longitude'] else None
+                except ValueError:
+                    raise CommandError('Invalid coordinates on line {}.'.format(line))
+                # Rejects nan and inf too, since comparisons with nan are always False
+                if latitude is not None and not -90 <= latitude <= 90:
+                    raise CommandError('Latitude out of range on line {}: {}'.format(line, row['latitude']))
+                if longitude is not None and not -180 <= longitude <= 180:
+                    raise CommandError('Longitude out of range on line {}: {}'.format(line, row['longitude']))
+                yield row['level'], row['code'], latitude, longitude
+
+    def handle(self, *args, **kwargs):
+        updated = 0
+        not_found = 0
+        with transaction.atomic():
+            for level, code, latitude, longitude in self.read_rows(kwargs['path']):
+                count = LEVEL_MODELS[level].objects.filter(code=code).update(latitude=latitude, longitude=longitude)
+                updated += count
+                not_found += not count
+        # Queryset updates do not send model signals
+        bump_dataset_version()
+
+        if kwargs['verbosity'] > 0:
+            self.stdout.write('Updated {updated} centroids, {not_found} codes not found.'.format(
+                updated=updated, not_found=not_found))
@@ -0,0 +1,62 @@
+import gzip
+import io
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from ph_geography import export
+from ph_geography.index import LEVELS
+
+
+class Command(BaseCommand):
+    help = 'Export all entries of a PH Geography level with their full hierarchy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('level', choices=LEVELS, help='Geography level to export.')
+        parser.add_argument('-o', '--output', help='Output file path. Defaults to standard output.')
+        parser.add_argument('-f', '--format', dest='fmt', choices=export.FORMATS, default=export.FORMAT_CSV,
+                            help='Output format. Defaults to "{}".'.format(export.FORMAT_CSV))
+        parser.add_argument('--gzip', action='store_true', help='Compress output with gzip.')
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE,
+                            help='Number of rows fetched per query. Defaults to {}.'.format(export.DEFAULT_CHUNK_SIZE))
+        parser.add_argument('--region', help='Only export entries under the region with the given code.')
+        parser.add_argument('--province', help='Only export entries under the province with the given code.')
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--active', dest='is_active', action='store_const', const=True,
+                           help='Only export active entries.')
+        group.add_argument('--inactive', dest='is_active', action='store_const', const=False,
+                           help='Only export inactive entries.')
+
+    def open_output(self, path, compress):
+        if compress:
+            if not path:
+                # Write compressed bytes to the binary stream under self.stdout, which honors call_command(stdout=...)
+                path = getattr(self.stdout._out, 'buffer', None)
+                if path is None:
+                    raise CommandError('Output with --gzip requires --output or a binary standard output.')
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        if path:
+            return io.open(path, 'wt', encoding='utf-8', newline='')
+        return None
+
+    def handle(self, *args, **kwargs):
+        if kwargs['chunk_size'] < 1:
+            raise CommandError('Chunk size must be a positive integer.')
+        filters = {
+            'region': kwargs['region'],
+            'province': kwargs['province'],
+            'is_active': kwargs['is_active'],
+        }
+        try:
+            chunks = export.iter_chunks(kwargs['level'], chunk_size=kwargs['chunk_size'], **filters)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stream = self.open_output(kwargs['output'], kwargs['gzip'])
+        try:
+            count = export.WRITERS[kwargs['fmt']](stream or self.stdout, export.get_columns(kwargs['level']), chunks)
+        finally:
+            if stream is not None:
+                stream.close()
+        if kwargs['verbosity'] > 0:
+            self.stderr.write('Exported {count} {level} entries.'.format(count=count, level=kwargs['level']))
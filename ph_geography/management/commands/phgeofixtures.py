@@ -1,5 +1,10 @@
 from django.core import management
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ph_geography.loading import LoadError
+from ph_geography.loading import load_fixtures
 
 
 class Command(BaseCommand):
@@ -13,8 +18,32 @@ class Command(BaseCommand):
         self.municipality_fixtures = 'municipalities.json'
         self.barangay_fixtures = 'barangays.json'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to load fixtures into.')
+        parser.add_argument('--lock', action='store_true',
+                            help='Hold a database lock while loading, and load all fixtures in a single transaction.')
+        parser.add_argument('--swap', action='store_true',
+                            help='Hold a database lock while loading, load fixtures into shadow tables, '
+                                 'and swap them with the live tables. PostgreSQL only.')
+        parser.add_argument('--lock-timeout', type=float, default=None,
+                            help='Seconds to wait for the database lock. Defaults to waiting forever.')
+
     def handle(self, *args, **kwargs):
-        management.call_command('loaddata', self.region_fixtures, app=self.app_name)
-        management.call_command('loaddata', self.province_fixtures, app=self.app_name)
-        management.call_command('loaddata', self.municipality_fixtures, app=self.app_name)
-        management.call_command('loaddata', self.barangay_fixtures, app=self.app_name)
+        fixtures = [
+            self.region_fixtures,
+            self.province_fixtures,
+            self.municipality_fixtures,
+            self.barangay_fixtures,
+        ]
+
+        if kwargs['lock'] or kwargs['swap']:
+            try:
+                load_fixtures(fixtures, using=kwargs['database'], swap=kwargs['swap'],
+                              lock_timeout=kwargs['lock_timeout'])
+            except LoadError as e:
+                raise CommandError(str(e))
+            return
+
+        for fixture in fixtures:
+            management.call_command('loaddata', fixture, app=self.app_name, database=kwargs['database'],
+                                    ignorenonexistent=True)
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ph_geography', '0002_centroids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='barangay',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Name'),
+        ),
+        migrations.AlterField(
+            model_name='municipality',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Name'),
+        ),
+        migrations.AlterField(
+            model_name='province',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Name'),
+        ),
+        migrations.AlterField(
+            model_name='region',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Name'),
+        ),
+    ]
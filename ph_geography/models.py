@@ -14,11 +14,19 @@ class PhilippineGeography(models.Model):
         * population - Population count based on 2015 POPCEN.
                         Null value  means no data is available.
         * is_active - Toggle if entry is active (True) or not (False).
+        * latitude - Latitude of the centroid in decimal degrees.
+                      Null value means no data is available.
+        * longitude - Longitude of the centroid in decimal degrees.
+                       Null value means no data is available.
     """
+    OPTIONAL_FIELDS = ('population', 'latitude', 'longitude')
+
     code = models.CharField(max_length=10, unique=True, null=False, verbose_name='Code')
-    name = models.CharField(max_length=100, null=False, verbose_name='Name')
+    name = models.CharField(max_length=100, null=False, db_index=True, verbose_name='Name')
     population = models.PositiveIntegerField(null=True, verbose_name='Population')
     is_active = models.BooleanField(null=False, default=True, verbose_name='Is Active')
+    latitude = models.FloatField(null=True, blank=True, verbose_name='Latitude')
+    longitude = models.FloatField(null=True, blank=True, verbose_name='Longitude')
 
     class Meta:
         abstract = True
@@ -48,6 +56,14 @@ class PhilippineGeography(models.Model):
                 raise AttributeError('No attribute name found in model: {name}'.format(name=name))
             else:
                 cls._meta.local_fields.remove(field)
+                # Drop the field descriptor, shadowing the one inherited from the abstract model
+                if field.attname in cls.__dict__:
+                    delattr(cls, field.attname)
+                if hasattr(cls, field.attname):
+                    setattr(cls, field.attname, None)
+        # Expire cached field lists of the model, then of all models once the registry is ready
+        cls._meta._expire_cache()
+        cls._meta.apps.clear_cache()
 
     @classmethod
     def remove_field(cls, *names):
@@ -76,6 +92,42 @@ class PhilippineGeography(models.Model):
         else:
             cls._remove_field(names)
 
+    @classmethod
+    def include_optional_fields(cls, *names, allow_not_null=False):
+        """
+        Keep only the given optional fields and remove the rest from the model.
+        Optional fields are listed in model property OPTIONAL_FIELDS.
+
+        Supports *args of <str> field names.
+
+        Fields without null support are only removed if allow_not_null is True, since inserts into tables
+        that still have their columns would fail. Only use it with migrations generated for the removed fields.
+
+        Using this method to the abstract model will apply the action to all subclasses.
+        """
+        if not all(isinstance(name, str) for name in names):
+            raise TypeError('"include_optional_fields" only supports <str> of field names.')
+
+        subclasses = cls.__subclasses__() if cls._meta.abstract else [cls]
+        optional = set(cls.OPTIONAL_FIELDS).union(*(subcls.OPTIONAL_FIELDS for subcls in subclasses))
+        unknown = set(names).difference(optional)
+        if unknown:
+            raise ValueError('No optional field found: {names}'.format(names=', '.join(sorted(unknown))))
+
+        excluded = {}
+        for subcls in subclasses:
+            local_fields = {field.name: field for field in subcls._meta.local_fields}
+            excluded[subcls] = [name for name in subcls.OPTIONAL_FIELDS if name not in names and name in local_fields]
+            if not allow_not_null:
+                not_null = [name for name in excluded[subcls] if not local_fields[name].null]
+                if not_null:
+                    raise ValueError('Optional fields without null support cannot be excluded: {names}'.format(
+                        names=', '.join('{}.{}'.format(subcls.__name__, name) for name in not_null)))
+
+        for subcls in subclasses:
+            if excluded[subcls]:
+                subcls._remove_field(excluded[subcls])
+
     def __repr__(self):
         code = getattr(self, 'code', None)
         name = getattr(self, 'name', None)
@@ -104,6 +156,10 @@ class Region(PhilippineGeography):
         * island_group - Island group where the region is located. Possible values are 'L' (for Luzon),
                          'V' (for Visayas), and 'M' (for Mindanao).
         * is_active - Toggle if region is active (True) or not (False).
+        * latitude - Latitude of the region centroid in decimal degrees.
+                      Null value means no data is available.
+        * longitude - Longitude of the region centroid in decimal degrees.
+                       Null value means no data is available.
     """
     ISLAND_GROUP_LUZON = 'L'
     ISLAND_GROUP_VISAYAS = 'V'
@@ -137,6 +193,10 @@ class Province(PhilippineGeography):
                           '4' (4th), '5' (5th), '6' (6th), and 'S' (Special).
                           Blank means no data is available.
         * is_active - Toggle if province is active (True) or not (False).
+        * latitude - Latitude of the province centroid in decimal degrees.
+                      Null value means no data is available.
+        * longitude - Longitude of the province centroid in decimal degrees.
+                       Null value means no data is available.
     """
     INCOME_CLASS_1 = '1'
     INCOME_CLASS_2 = '2'
@@ -154,6 +214,7 @@ class Province(PhilippineGeography):
         (INCOME_CLASS_6, '6TH'),
         (INCOME_CLASS_SPECIAL, 'SPECIAL'),
     )
+    OPTIONAL_FIELDS = PhilippineGeography.OPTIONAL_FIELDS + ('income_class',)
 
     region = models.ForeignKey(
         Region,
@@ -195,6 +256,10 @@ class Municipality(PhilippineGeography):
                           '4' (4th), '5' (5th), '6' (6th), and 'S' (Special).
                           Blank value means no data is available.
         * is_active - Toggle if municipality is active (True) or not (False).
+        * latitude - Latitude of the municipality centroid in decimal degrees.
+                      Null value means no data is available.
+        * longitude - Longitude of the municipality centroid in decimal degrees.
+                       Null value means no data is available.
     """
     CITY_CLASS_COMPONENT_CITY = 'C'
     CITY_CLASS_INDEPENDENT_COMPONENT_CITY = 'I'
@@ -220,6 +285,7 @@ class Municipality(PhilippineGeography):
         (INCOME_CLASS_6, '6TH'),
         (INCOME_CLASS_SPECIAL, 'SPECIAL'),
     )
+    OPTIONAL_FIELDS = PhilippineGeography.OPTIONAL_FIELDS + ('is_city', 'is_capital', 'city_class', 'income_class')
 
     province = models.ForeignKey(
         Province,
@@ -263,7 +329,13 @@ class Barangay(PhilippineGeography):
         * is_urban - Toggle to define whether the barangay is urban (True) or rural (False).
                       Null value means no data is available.
         * is_active - Toggle if barangay is active (True) or not (False).
+        * latitude - Latitude of the barangay centroid in decimal degrees.
+                      Null value means no data is available.
+        * longitude - Longitude of the barangay centroid in decimal degrees.
+                       Null value means no data is available.
     """
+    OPTIONAL_FIELDS = PhilippineGeography.OPTIONAL_FIELDS + ('is_urban',)
+
     municipality = models.ForeignKey(
         Municipality,
         related_name='barangays',
@@ -290,3 +362,23 @@ class Barangay(PhilippineGeography):
     @property
     def island_group(self):
         return self.region.island_group
+
+
+class DatasetVersion(models.Model):
+    """
+    Model for the shared version of the geography data.
+
+    Holds a single row, replaced whenever geography data is changed or loaded, so every process
+    can tell when its in-memory index is outdated.
+
+    Available fields are:
+        * token - Random token of the current version.
+        * updated_at - Date and time of the last change.
+    """
+    token = models.CharField(max_length=32, null=False, verbose_name='Token')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+
+    class Meta:
+        db_table = 'ph_geography_dataset_version'
+        verbose_name = 'Dataset Version'
+        verbose_name_plural = 'Dataset Versions'
@@ -0,0 +1,93 @@
+from ph_geography.index import LEVEL_MODELS
+from ph_geography.index import LEVEL_PARENTS
+from ph_geography.index import LEVEL_REGION
+
+DEFAULT_FIELDS = ('code', 'name')
+
+MODEL_LEVELS = dict((model, level) for level, model in LEVEL_MODELS.items())
+
+
+def get_hierarchy(model):
+    """
+    Returns a list of (level, queryset lookup) of the ancestors of the model, nearest first.
+    """
+    hierarchy = []
+    level = LEVEL_PARENTS.get(MODEL_LEVELS.get(model))
+    lookup = ''
+    while level:
+        lookup = '{lookup}__{level}'.format(lookup=lookup, level=level) if lookup else level
+        hierarchy.append((level, lookup))
+        level = LEVEL_PARENTS[level]
+    return hierarchy
+
+
+def get_island_group_lookup(model):
+    """
+    Returns the queryset lookup of the island group of the model, or None if not applicable.
+    """
+    level = MODEL_LEVELS.get(model)
+    if level == LEVEL_REGION:
+        return 'island_group'
+    hierarchy = get_hierarchy(model)
+    if hierarchy:
+        return '{lookup}__island_group'.format(lookup=hierarchy[-1][1])
+    return None
+
+
+def to_dict(instance, fields=DEFAULT_FIELDS):
+    """
+    Returns a flattened hierarchy dict of a model instance.
+
+    Example output for a barangay:
+        {
+            'code': '137404031', 'name': 'DOÑA IMELDA',
+            'municipality': {'code': '137404000', 'name': 'QUEZON CITY'},
+            'province': {'code': '130000000', 'name': 'METRO MANILA'},
+            'region': {'code': '130000000', 'name': 'NATIONAL CAPITAL REGION (NCR)'},
+            'island_group': 'L',
+        }
+
+    Use serialize() for querysets.
+    """
+    data = dict((field, getattr(instance, field)) for field in fields)
+    for level, _ in get_hierarchy(instance.__class__):
+        parent = getattr(instance, level)
+        data[level] = {'code': parent.code, 'name': parent.name}
+    if get_island_group_lookup(instance.__class__):
+        data['island_group'] = instance.island_group
+    return data
+
+
+def serialize(queryset, fields=DEFAULT_FIELDS):
+    """
+    Returns a list of flattened hierarchy dicts of a queryset. See to_dict() for the output format.
+
+    Rows are fetched in a single query with the hierarchy joined, and parent dicts are shared between rows
+    of the same parent instead of being rebuilt per row. Treat the returned dicts as read-only.
+    """
+    model = queryset.model
+    hierarchy = get_hierarchy(model)
+    island_group = get_island_group_lookup(model)
+
+    lookups = list(fields)
+    for _, lookup in hierarchy:
+        lookups.extend(['{}__code'.format(lookup), '{}__name'.format(lookup)])
+    if island_group:
+        lookups.append(island_group)
+
+    field_count = len(fields)
+    parents = [(level, field_count + 2 * i, {}) for i, (level, _) in enumerate(hierarchy)]
+
+    results = []
+    for row in queryset.values_list(*lookups):
+        data = dict(zip(fields, row))
+        for level, offset, cache in parents:
+            code = row[offset]
+            parent = cache.get(code)
+            if parent is None:
+                parent = cache[code] = {'code': code, 'name': row[offset + 1]}
+            data[level] = parent
+        if island_group:
+            data['island_group'] = row[-1]
+        results.append(data)
+    return results
@@ -0,0 +1,182 @@
+import heapq
+import math
+import threading
+
+from ph_geography.index import LEVELS
+from ph_geography.index import get_index
+
+EARTH_RADIUS_KM = 6371.0088
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def to_xyz(latitude, longitude):
+    """
+    Returns the unit vector (x, y, z) of a point on the sphere.
+
+    Euclidean (chord) distances between unit vectors grow with great-circle distances,
+    so nearest neighbours in 3D space are nearest neighbours on the globe.
+    """
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError('Invalid coordinates: {lat}, {lon}'.format(lat=latitude, lon=longitude))
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+def chord_to_km(chord):
+    """
+    Returns the great-circle distance in kilometers of a chord between unit vectors.
+    """
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(distance):
+    """
+    Returns the chord between unit vectors of a great-circle distance in kilometers.
+    """
+    return 2 * math.sin(min(distance / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
+
+class KDTree(object):
+    """
+    Static 3D k-d tree over unit vectors of geographical points.
+
+    Each tree node is a tuple of (item index, split axis, left subtree, right subtree).
+    """
+
+    def __init__(self, points, items):
+        self.points = [to_xyz(latitude, longitude) for latitude, longitude in points]
+        self.items = list(items)
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        median = len(indices) // 2
+        return (
+            indices[median],
+            axis,
+            self._build(indices[:median], depth + 1),
+            self._build(indices[median + 1:], depth + 1),
+        )
+
+    def _distance2(self, point, index):
+        x, y, z = self.points[index]
+        return (point[0] - x) ** 2 + (point[1] - y) ** 2 + (point[2] - z) ** 2
+
+    def nearest(self, latitude, longitude, k=1):
+        """
+        Returns a list of (item, distance in km) of the k nearest items, nearest first.
+        """
+        if k < 1:
+            raise ValueError('k must be a positive integer.')
+        point = to_xyz(latitude, longitude)
+        heap = []
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, plane2 = stack.pop()
+            # Skip subtrees whose splitting plane is farther than the current k-th nearest
+            if node is None or (len(heap) == k and plane2 >= -heap[0][0]):
+                continue
+            index, axis, left, right = node
+            distance2 = self._distance2(point, index)
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance2, index))
+            elif distance2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance2, index))
+
+            diff = point[axis] - self.points[index][axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, diff * diff))
+            stack.append((near, 0.0))
+
+        return [(self.items[index], chord_to_km(math.sqrt(-distance2)))
+                for distance2, index in sorted(heap, reverse=True)]
+
+    def within_radius(self, latitude, longitude, radius):
+        """
+        Returns a list of (item, distance in km) of all items within the radius in km, nearest first.
+        """
+        if radius < 0:
+            raise ValueError('radius must not be negative.')
+        point = to_xyz(latitude, longitude)
+        radius2 = km_to_chord(radius) ** 2
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            index, axis, left, right = node
+            distance2 = self._distance2(point, index)
+            if distance2 <= radius2:
+                found.append((distance2, index))
+
+            diff = point[axis] - self.points[index][axis]
+            if diff < 0 or diff * diff <= radius2:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= radius2:
+                stack.append(right)
+
+        found.sort()
+        return [(self.items[index], chord_to_km(math.sqrt(distance2))) for distance2, index in found]
+
+
+def get_tree(level, active_only=True):
+    """
+    Returns the KDTree of nodes with centroids of the given level, built from the shared GeographyIndex.
+
+    Trees are built on first use and rebuilt whenever the GeographyIndex is discarded.
+    """
+    if level not in LEVELS:
+        raise ValueError('Unsupported level: {level}'.format(level=level))
+
+    index = get_index()
+    key = (level, active_only)
+    cached = _cache.get(key)
+    if cached is None or cached[0] is not index:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] is not index:
+                nodes = [
+                    node for node in index.nodes[level].values()
+                    if node.latitude is not None and node.longitude is not None
+                    and (node.is_active or not active_only)
+                ]
+                tree = KDTree([(node.latitude, node.longitude) for node in nodes], nodes)
+                cached = _cache[key] = (index, tree)
+    return cached[1]
+
+
+def nearest(latitude, longitude, level, k=1, active_only=True):
+    """
+    Returns a list of (Node, distance in km) of the k nearest entries of the given level, nearest first.
+    """
+    return get_tree(level, active_only=active_only).nearest(latitude, longitude, k=k)
+
+
+def within_radius(latitude, longitude, radius, level, active_only=True):
+    """
+    Returns a list of (Node, distance in km) of all entries of the given level within the radius in km,
+    nearest first.
+    """
+    return get_tree(level, active_only=active_only).within_radius(latitude, longitude, radius)
+
+
+def nearest_many(points, level, k=1, active_only=True):
+    """
+    Yields a list of (Node, distance in km) of the k nearest entries for each (latitude, longitude) in points.
+
+    The tree is looked up once, so large batches only pay for the queries.
+    """
+    tree = get_tree(level, active_only=active_only)
+    for latitude, longitude in points:
+        yield tree.nearest(latitude, longitude, k=k)
@@ -0,0 +1,55 @@
+(function () {
+    'use strict';
+
+    var CODE_PLACEHOLDER = '__code__';
+
+    function clearOptions(select) {
+        var emptyOption = select.querySelector('option[value=""]');
+        while (select.options.length) {
+            select.remove(0);
+        }
+        if (emptyOption) {
+            select.add(emptyOption);
+        }
+    }
+
+    function loadOptions(select, parentCode) {
+        var url = select.getAttribute('data-ph-geography-url');
+        if (!url || !parentCode) {
+            return;
+        }
+        fetch(url.replace(CODE_PLACEHOLDER, encodeURIComponent(parentCode)), {credentials: 'same-origin'})
+            .then(function (response) {
+                return response.ok ? response.json() : {results: []};
+            })
+            .then(function (data) {
+                data.results.forEach(function (item) {
+                    select.add(new Option(item.name, item.code));
+                });
+            });
+    }
+
+    function bind(select) {
+        var parent = document.getElementById(select.getAttribute('data-ph-geography-parent'));
+        if (!parent) {
+            return;
+        }
+        parent.addEventListener('change', function () {
+            clearOptions(select);
+            // Clear the options of descendant selects as well
+            select.dispatchEvent(new Event('change'));
+            loadOptions(select, parent.value);
+        });
+    }
+
+    function init() {
+        var selects = document.querySelectorAll('select[data-ph-geography-parent]');
+        Array.prototype.forEach.call(selects, bind);
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
@@ -0,0 +1,23 @@
+try:
+    from django.urls import re_path
+except ImportError:  # Django < 2.0
+    from django.conf.urls import url as re_path
+
+from ph_geography import views
+from ph_geography.index import LEVEL_BARANGAY
+from ph_geography.index import LEVEL_MUNICIPALITY
+from ph_geography.index import LEVEL_PROVINCE
+from ph_geography.index import LEVEL_REGION
+
+app_name = 'ph_geography'
+
+urlpatterns = [
+    re_path(r'^regions/$', views.children,
+            {'level': LEVEL_REGION}, name='regions'),
+    re_path(r'^regions/(?P<code>\w+)/provinces/$', views.children,
+            {'level': LEVEL_PROVINCE}, name='provinces'),
+    re_path(r'^provinces/(?P<code>\w+)/municipalities/$', views.children,
+            {'level': LEVEL_MUNICIPALITY}, name='municipalities'),
+    re_path(r'^municipalities/(?P<code>\w+)/barangays/$', views.children,
+            {'level': LEVEL_BARANGAY}, name='barangays'),
+]
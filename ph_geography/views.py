@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.http import Http404
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.http import require_safe
+
+from ph_geography.index import LEVEL_PARENTS
+from ph_geography.index import get_index
+
+CACHE_MAX_AGE = getattr(settings, 'PH_GEOGRAPHY_CACHE_MAX_AGE', 60 * 60 * 24 * 7)
+
+
+def get_request_index(request):
+    """
+    Returns the GeographyIndex of the request, resolved once, so the ETag and the body always come
+    from the same index even if it is rebuilt in between.
+    """
+    index = getattr(request, '_ph_geography_index', None)
+    if index is None:
+        index = request._ph_geography_index = get_index()
+    return index
+
+
+def children_etag(request, level, code=None):
+    """
+    Returns the dataset version as ETag. Raises Http404 if the parent code does not exist.
+
+    Raising here skips cache_control, so 404 responses are not cached for CACHE_MAX_AGE
+    and codes added later are served as soon as they exist.
+    """
+    index = get_request_index(request)
+    parent = LEVEL_PARENTS[level]
+    if parent and index.get(parent, code) is None:
+        raise Http404('No {parent} found with code: {code}'.format(parent=parent, code=code))
+    return index.version
+
+
+@require_safe
+@cache_control(public=True, max_age=CACHE_MAX_AGE)
+@condition(etag_func=children_etag)
+def children(request, level, code=None):
+    """
+    Returns active entries of the given level under the parent code as compact JSON.
+
+    Served from the in-memory index. Responses carry a strong ETag derived from the dataset version,
+    so conditional requests from browsers and CDNs are answered with 304 Not Modified.
+    """
+    index = get_request_index(request)
+    return HttpResponse(index.children_json(level, code), content_type='application/json')
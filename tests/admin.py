@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from ph_geography.admin import BarangayAdmin
+from ph_geography.admin import MunicipalityAdmin
+from ph_geography.admin import ProvinceAdmin
+from ph_geography.admin import RegionAdmin
+from ph_geography.models import Barangay
+from ph_geography.models import Municipality
+from ph_geography.models import Province
+from ph_geography.models import Region
+
+# Registered as documented, raises AlreadyRegistered if ph_geography.admin registers the models itself
+admin.site.register(Region, RegionAdmin)
+admin.site.register(Province, ProvinceAdmin)
+admin.site.register(Municipality, MunicipalityAdmin)
+admin.site.register(Barangay, BarangayAdmin)
@@ -0,0 +1,10 @@
+from django.db import models
+
+from ph_geography.models import Barangay
+
+
+class Address(models.Model):
+    """
+    Model referencing the provided models, for testing table swaps with foreign keys from other tables.
+    """
+    barangay = models.ForeignKey(Barangay, related_name='+', on_delete=models.CASCADE)
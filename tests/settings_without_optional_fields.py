@@ -0,0 +1,12 @@
+from tests.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+# Exclude all optional fields, with tables created from the models instead of the provided migrations
+MIGRATION_MODULES = {'ph_geography': None}
+PH_GEOGRAPHY_OPTIONAL_FIELDS = []
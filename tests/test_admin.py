@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ph_geography.admin import ApproximateCountPaginator
+from ph_geography.index import clear_index
+from ph_geography.models import Barangay
+from tests.utils import run_with_settings
+
+CHECK_SCRIPT = '''
+from django.contrib.auth.models import User
+from django.test import Client
+from django.test.utils import setup_test_environment
+
+management.call_command('check')
+setup_test_environment()
+client = Client()
+client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+for model in ('region', 'province', 'municipality', 'barangay'):
+    print(model, client.get('/admin/ph_geography/{}/'.format(model)).status_code)
+'''
+
+
+class AdminTestCase(TestCase):
+    """
+    Test cases for django-ph-geography admin
+
+    Testing these cases:
+        * Changelist of each model
+        * Optional fields in changelists
+        * System checks and changelists with all optional fields excluded
+        * Hierarchy list filters
+        * Search
+        * Paginator count fallback
+    """
+    fixtures = ('geography.json',)
+
+    REGION_CODE = '130000000'
+    PROVINCE_CODE = '130000000'
+
+    def setUp(self):
+        clear_index()
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+    def get_changelist(self, model, params=None):
+        """Returns the changelist response of the model"""
+        response = self.client.get('/admin/ph_geography/{}/'.format(model), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelists(self):
+        for model in ('region', 'province', 'municipality', 'barangay'):
+            self.get_changelist(model)
+
+    def test_municipality_changelist_optional_fields(self):
+        response = self.get_changelist('municipality')
+        self.assertIn('is_city', response.context['cl'].list_display)
+        self.assertIn('is_city', response.context['cl'].list_filter)
+
+    def test_without_optional_fields(self):
+        returncode, output = run_with_settings('tests.settings_without_optional_fields', CHECK_SCRIPT)
+        self.assertEqual(returncode, 0, output)
+        for model in ('region', 'province', 'municipality', 'barangay'):
+            self.assertIn('{} 200'.format(model), output)
+
+    def test_barangay_changelist_hierarchy_filters(self):
+        response = self.get_changelist('barangay', {'region': self.REGION_CODE, 'province': self.PROVINCE_CODE})
+        self.assertEqual(response.context['cl'].result_count, Barangay.objects.count())
+
+    def test_barangay_changelist_hierarchy_filters_no_match(self):
+        response = self.get_changelist('barangay', {'province': '_'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_barangay_changelist_search(self):
+        barangay = Barangay.objects.first()
+        response = self.get_changelist('barangay', {'q': barangay.code})
+        self.assertEqual(list(response.context['cl'].result_list), [barangay])
+
+    def test_barangay_changelist_search_name_prefix(self):
+        barangay = Barangay.objects.first()
+        response = self.get_changelist('barangay', {'q': barangay.name[:3].lower()})
+        self.assertIn(barangay, response.context['cl'].result_list)
+
+    def test_paginator_count_fallback(self):
+        paginator = ApproximateCountPaginator(Barangay.objects.order_by('id'), 100)
+        self.assertEqual(paginator.count, Barangay.objects.count())
@@ -0,0 +1,100 @@
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core import management
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ph_geography import export
+from ph_geography.models import Barangay
+
+
+class ExportTestCase(TestCase):
+    """
+    Test cases for django-ph-geography export
+
+    Testing these cases:
+        * Keyset pagination chunks
+        * Hierarchy columns
+        * Filters
+        * Output formats
+        * Custom command 'phgeoexport'
+    """
+    fixtures = ('geography.json',)
+
+    REGION_CODE = '130000000'
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_iter_chunks_size(self):
+        chunks = list(export.iter_chunks('barangay', chunk_size=1))
+        self.assertEqual([len(chunk) for chunk in chunks], [1] * Barangay.objects.count())
+
+    def test_iter_rows_hierarchy(self):
+        columns = export.get_columns('barangay')
+        row = dict(zip(columns, next(export.iter_rows('barangay'))))
+        self.assertEqual(row['region_code'], self.REGION_CODE)
+        self.assertEqual(row['island_group'], 'L')
+
+    def test_iter_rows_filters(self):
+        self.assertTrue(list(export.iter_rows('barangay', region=self.REGION_CODE, is_active=True)))
+        self.assertFalse(list(export.iter_rows('barangay', province='_')))
+        self.assertFalse(list(export.iter_rows('barangay', is_active=False)))
+
+    def test_iter_rows_unsupported_filter(self):
+        with self.assertRaises(ValueError):
+            next(export.iter_rows('region', province=self.REGION_CODE))
+
+    def test_export_csv(self):
+        stream = io.StringIO()
+        count = export.export('barangay', stream, fmt=export.FORMAT_CSV)
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        self.assertEqual(rows[0], export.get_columns('barangay'))
+        self.assertEqual(len(rows) - 1, count)
+
+    def test_export_jsonl(self):
+        stream = io.StringIO()
+        count = export.export('municipality', stream, fmt=export.FORMAT_JSONL)
+        rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(rows), count)
+        self.assertEqual(rows[0]['province_code'], self.REGION_CODE)
+
+    def test_export_columnar(self):
+        stream = io.StringIO()
+        count = export.export('barangay', stream, fmt=export.FORMAT_COLUMNAR, chunk_size=1)
+        groups = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(groups), count)
+        self.assertEqual(sorted(groups[0]['columns']), sorted(export.get_columns('barangay')))
+
+    def test_export_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            export.export('barangay', io.StringIO(), fmt='_')
+
+    def test_command_phgeoexport_gzip(self):
+        path = os.path.join(self.tempdir, 'barangays.jsonl.gz')
+        management.call_command('phgeoexport', 'barangay', output=path, fmt='jsonl', gzip=True, verbosity=0)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), Barangay.objects.count())
+
+    def test_command_phgeoexport_gzip_stdout(self):
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        management.call_command('phgeoexport', 'barangay', fmt='jsonl', gzip=True, stdout=stdout, verbosity=0)
+        content = gzip.decompress(stdout.buffer.getvalue()).decode('utf-8')
+        self.assertEqual(len(content.splitlines()), Barangay.objects.count())
+
+    def test_command_phgeoexport_gzip_text_stdout(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeoexport', 'barangay', gzip=True, stdout=io.StringIO(), verbosity=0)
+
+    def test_command_phgeoexport_unsupported_filter(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeoexport', 'region', province=self.REGION_CODE, verbosity=0)
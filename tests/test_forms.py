@@ -0,0 +1,106 @@
+from django import forms
+from django.test import TestCase
+
+from ph_geography.forms import BarangayChoiceField
+from ph_geography.forms import CascadingGeographyFormMixin
+from ph_geography.forms import MunicipalityChoiceField
+from ph_geography.forms import ProvinceChoiceField
+from ph_geography.forms import RegionChoiceField
+from ph_geography.index import clear_index
+from ph_geography.index import get_index
+from ph_geography.models import Barangay
+from ph_geography.models import Municipality
+from ph_geography.models import Region
+
+
+class AddressForm(CascadingGeographyFormMixin, forms.Form):
+    region = RegionChoiceField()
+    province = ProvinceChoiceField(parent_field='region')
+    municipality = MunicipalityChoiceField(parent_field='province')
+    barangay = BarangayChoiceField(parent_field='municipality')
+
+
+class BarangayForm(CascadingGeographyFormMixin, forms.Form):
+    barangay = BarangayChoiceField()
+
+
+class FormTestCase(TestCase):
+    """
+    Test cases for django-ph-geography form fields
+
+    Testing these cases:
+        * Choices limited to the parent entry
+        * Initial values derived from child entries
+        * Validation of submitted codes
+        * Chained dropdown view URL
+    """
+    fixtures = ('geography.json',)
+
+    REGION_CODE = '130000000'
+    PROVINCE_CODE = '130000000'
+    MUNICIPALITY_CODE = '137404000'
+
+    def setUp(self):
+        clear_index()
+        get_index()
+        self.barangay = Barangay.objects.first()
+        self.data = {
+            'region': self.REGION_CODE,
+            'province': self.PROVINCE_CODE,
+            'municipality': self.MUNICIPALITY_CODE,
+            'barangay': self.barangay.code,
+        }
+
+    @staticmethod
+    def get_choice_values(form, name):
+        """Returns a list of choice values of the form field"""
+        return [value for value, _ in form.fields[name].choices]
+
+    def test_unbound_choices(self):
+        form = AddressForm()
+        self.assertEqual(self.get_choice_values(form, 'region'), ['', self.REGION_CODE])
+        self.assertEqual(self.get_choice_values(form, 'province'), [''])
+
+    def test_unbound_render_no_queries(self):
+        form = AddressForm(initial={'barangay': self.barangay})
+        with self.assertNumQueries(0):
+            html = form.as_p()
+        self.assertIn('data-ph-geography-url="/ph-geography/municipalities/__code__/barangays/"', html)
+        self.assertIn('data-ph-geography-parent="id_municipality"', html)
+
+    def test_initial_derived_from_child(self):
+        form = AddressForm(initial={'barangay': self.barangay.pk})
+        self.assertEqual(form.initial['region'], self.REGION_CODE)
+        self.assertEqual(self.get_choice_values(form, 'barangay'), ['', self.barangay.code])
+
+    def test_initial_siblings_without_parent_field(self):
+        form = BarangayForm(initial={'barangay': self.barangay})
+        self.assertEqual(self.get_choice_values(form, 'barangay'), ['', self.barangay.code])
+
+    def test_bound_valid(self):
+        form = AddressForm(data=self.data)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['barangay'], self.barangay)
+        self.assertIsInstance(form.cleaned_data['municipality'], Municipality)
+
+    def test_bound_parent_mismatch(self):
+        region = Region.objects.create(code='REGION', name='REGION', island_group=Region.ISLAND_GROUP_LUZON)
+        clear_index()
+        form = AddressForm(data=dict(self.data, region=region.code))
+        self.assertFalse(form.is_valid())
+        self.assertIn('province', form.errors)
+
+    def test_bound_inactive(self):
+        Barangay.objects.filter(pk=self.barangay.pk).update(is_active=False)
+        clear_index()
+        form = AddressForm(data=self.data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('barangay', form.errors)
+
+    def test_bound_unknown_code(self):
+        form = BarangayForm(data={'barangay': '_'})
+        self.assertFalse(form.is_valid())
+
+    def test_has_changed(self):
+        form = BarangayForm(initial={'barangay': self.barangay.pk}, data={'barangay': self.barangay.code})
+        self.assertFalse(form.has_changed())
@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from unittest import mock
+from unittest import skipIf
+from unittest import skipUnless
+
+from django.core import management
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.db import OperationalError
+from django.db import connection
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from ph_geography.index import get_dataset_version
+from ph_geography.loading import LOCK_NAME
+from ph_geography.loading import LOCK_TABLE
+from ph_geography.loading import LoadError
+from ph_geography.loading import get_migration_models
+from ph_geography.loading import load_fixtures
+from ph_geography.loading import load_lock
+from ph_geography.loading import load_swap
+from ph_geography.models import Barangay
+from ph_geography.models import Province
+from ph_geography.models import Region
+from tests.models import Address
+
+GEOGRAPHY_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'geography.json')
+
+# Advisory locks are reentrant within a connection, so only the lock table fallback can be tested with one
+lock_table_only = skipIf(connection.vendor in ('postgresql', 'mysql'), 'Lock table fallback not used')
+
+
+class LoadingTestCase(TransactionTestCase):
+    """
+    Test cases for django-ph-geography concurrency-safe loading
+
+    Testing these cases:
+        * Load lock (lock table fallback)
+        * Lock table heartbeat, takeover, and busy database
+        * Loading in a single transaction
+        * Shared dataset version bump after loading
+        * Migration state models
+        * Table swap support
+    """
+    FIXTURES = ['regions.json', 'provinces.json']
+
+    @lock_table_only
+    def test_load_lock_timeout(self):
+        with load_lock():
+            with self.assertRaises(LoadError):
+                with load_lock(timeout=0):
+                    pass
+
+    def test_load_lock_released(self):
+        with load_lock():
+            pass
+        with load_lock(timeout=0):
+            pass
+
+    def get_lock_rows(self):
+        """Returns a list of (holder, acquired_at) of the lock table"""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT holder, acquired_at FROM {} WHERE name = %s'.format(
+                connection.ops.quote_name(LOCK_TABLE)), [LOCK_NAME])
+            return cursor.fetchall()
+
+    def insert_lock_row(self, acquired_at):
+        """Insert a lock table row of another holder"""
+        with load_lock():
+            pass
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO {} (name, holder, acquired_at) VALUES (%s, %s, %s)'.format(
+                connection.ops.quote_name(LOCK_TABLE)), [LOCK_NAME, 'other', acquired_at])
+
+    @lock_table_only
+    @mock.patch('ph_geography.loading.LOCK_HEARTBEAT_INTERVAL', 0.05)
+    def test_load_lock_heartbeat(self):
+        with load_lock():
+            holder, acquired_at = self.get_lock_rows()[0]
+            time.sleep(0.5)
+            self.assertEqual(self.get_lock_rows()[0][0], holder)
+            self.assertGreater(self.get_lock_rows()[0][1], acquired_at)
+        self.assertEqual(self.get_lock_rows(), [])
+
+    @lock_table_only
+    def test_load_lock_live_holder(self):
+        self.insert_lock_row(time.time())
+        with self.assertRaises(LoadError):
+            with load_lock(timeout=0):
+                pass
+        self.assertEqual(self.get_lock_rows()[0][0], 'other')
+
+    @lock_table_only
+    def test_load_lock_stale_holder(self):
+        self.insert_lock_row(time.time() - 120)
+        with load_lock(timeout=0):
+            self.assertNotEqual(self.get_lock_rows()[0][0], 'other')
+
+    @lock_table_only
+    @mock.patch('ph_geography.loading.LOCK_POLL_INTERVAL', 0.01)
+    def test_load_lock_database_busy(self):
+        atomic = transaction.atomic
+        calls = []
+
+        def busy_atomic(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return atomic(*args, **kwargs)
+
+        with mock.patch('ph_geography.loading.transaction.atomic', side_effect=busy_atomic):
+            with load_lock(timeout=5):
+                pass
+        self.assertEqual(len(calls), 2)
+
+    def test_load_fixtures(self):
+        load_fixtures(self.FIXTURES)
+        self.assertTrue(Region.objects.exists())
+        self.assertTrue(Province.objects.exists())
+
+    def test_load_fixtures_dataset_version(self):
+        token = get_dataset_version()
+        load_fixtures(self.FIXTURES)
+        self.assertNotEqual(get_dataset_version(), token)
+
+    def test_save_dataset_version(self):
+        load_fixtures(self.FIXTURES)
+        token = get_dataset_version()
+        Region.objects.first().save()
+        self.assertNotEqual(get_dataset_version(), token)
+
+    def test_load_fixtures_not_found(self):
+        with self.assertRaises(LoadError):
+            load_fixtures(self.FIXTURES + ['_.json'])
+        self.assertFalse(Region.objects.exists())
+
+    @skipIf(connection.vendor == 'postgresql', 'Table swap supported')
+    def test_load_swap_unsupported(self):
+        with self.assertRaises(LoadError):
+            load_swap(self.FIXTURES)
+
+    def test_migration_models(self):
+        models = get_migration_models()
+        self.assertEqual(models['barangay']._meta.db_table, Barangay._meta.db_table)
+        self.assertEqual(sorted(field.column for field in models['barangay']._meta.concrete_fields),
+                         sorted(field.column for field in Barangay._meta.concrete_fields))
+        self.assertIs(models['province']._meta.get_field('region').related_model, models['region'])
+
+    @skipIf(connection.vendor == 'postgresql', 'Table swap supported')
+    def test_command_phgeofixtures_swap_unsupported(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeofixtures', swap=True, verbosity=0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Table swap is only supported on PostgreSQL')
+class TableSwapTestCase(TransactionTestCase):
+    """
+    Test cases for django-ph-geography table swap, PostgreSQL only
+
+    Testing these cases:
+        * Swapping tables
+        * Live tables with more entries than the fixtures
+        * Foreign keys of other tables
+        * Table lock timeout and retry
+    """
+
+    def get_schemas(self):
+        """Returns a list of shadow and old schemas left behind"""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nspname FROM pg_namespace WHERE nspname LIKE %s', ['ph_geography_%'])
+            return [row[0] for row in cursor.fetchall()]
+
+    def hold_table_lock(self, seconds):
+        """Hold a lock on the live region table from another connection, returns the thread"""
+        locked = threading.Event()
+
+        def hold():
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute('LOCK TABLE ph_geography_region IN ACCESS SHARE MODE')
+                locked.set()
+                time.sleep(seconds)
+            connection.close()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        locked.wait()
+        return thread
+
+    def test_load_swap(self):
+        load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        barangay = Barangay.objects.select_related('municipality__province__region').get()
+        self.assertEqual(barangay.region.code, '130000000')
+        # Sequences are reset past the loaded primary keys
+        region = Region.objects.create(code='REGION', name='REGION', island_group=Region.ISLAND_GROUP_LUZON)
+        self.assertGreater(region.pk, barangay.region.pk)
+        self.assertEqual(self.get_schemas(), [])
+
+    def test_load_swap_twice(self):
+        load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        self.assertEqual(Barangay.objects.count(), 1)
+
+    def test_load_swap_fewer_entries(self):
+        load_fixtures([GEOGRAPHY_FIXTURE])
+        Region.objects.create(code='REGION', name='REGION', island_group=Region.ISLAND_GROUP_LUZON)
+        with self.assertRaises(LoadError):
+            load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        self.assertEqual(Region.objects.count(), 2)
+        self.assertEqual(self.get_schemas(), [])
+
+    def test_load_swap_missing_level(self):
+        with self.assertRaises(LoadError):
+            load_fixtures(['regions.json', 'provinces.json'], swap=True)
+        self.assertEqual(self.get_schemas(), [])
+
+    def test_load_swap_external_references(self):
+        load_fixtures([GEOGRAPHY_FIXTURE])
+        address = Address.objects.create(barangay=Barangay.objects.get())
+        load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        self.assertEqual(Address.objects.get().barangay.code, address.barangay.code)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT convalidated FROM pg_constraint WHERE conrelid = 'tests_address'::regclass "
+                           "AND contype = 'f'")
+            self.assertEqual(cursor.fetchall(), [(True,)])
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Address.objects.create(barangay_id=0)
+
+    @mock.patch('ph_geography.loading.SWAP_LOCK_TIMEOUT', 100)
+    @mock.patch('ph_geography.loading.SWAP_ATTEMPTS', 2)
+    @mock.patch('ph_geography.loading.SWAP_RETRY_INTERVAL', 0.1)
+    def test_load_swap_lock_timeout(self):
+        thread = self.hold_table_lock(2)
+        try:
+            with self.assertRaises(LoadError):
+                load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        finally:
+            thread.join()
+        self.assertFalse(Region.objects.exists())
+        self.assertEqual(self.get_schemas(), [])
+
+    @mock.patch('ph_geography.loading.SWAP_LOCK_TIMEOUT', 100)
+    @mock.patch('ph_geography.loading.SWAP_ATTEMPTS', 20)
+    @mock.patch('ph_geography.loading.SWAP_RETRY_INTERVAL', 0.1)
+    def test_load_swap_lock_retry(self):
+        thread = self.hold_table_lock(0.5)
+        try:
+            load_fixtures([GEOGRAPHY_FIXTURE], swap=True)
+        finally:
+            thread.join()
+        self.assertTrue(Region.objects.exists())
@@ -59,7 +59,7 @@ class ModelTestCase(TestCase):
     def test_region_fields_list(self):
         self.assertEqual(
             self.get_sorted_field_names(Region),
-            ['code', 'id', 'is_active', 'island_group', 'name', 'population', 'province']
+            ['code', 'id', 'is_active', 'island_group', 'latitude', 'longitude', 'name', 'population', 'province']
         )
 
     def test_region_island_group_choices(self):
@@ -83,7 +83,8 @@ class ModelTestCase(TestCase):
     def test_province_fields_list(self):
         self.assertEqual(
             self.get_sorted_field_names(Province),
-            ['code', 'id', 'income_class', 'is_active', 'municipality', 'name', 'population', 'region', ]
+            ['code', 'id', 'income_class', 'is_active', 'latitude', 'longitude', 'municipality', 'name',
+             'population', 'region', ]
         )
 
     def test_province_income_class_choices(self):
@@ -111,7 +112,7 @@ class ModelTestCase(TestCase):
         self.assertEqual(
             self.get_sorted_field_names(Municipality),
             ['barangays', 'city_class', 'code', 'id', 'income_class', 'is_active',
-             'is_capital', 'is_city', 'name', 'population', 'province', ]
+             'is_capital', 'is_city', 'latitude', 'longitude', 'name', 'population', 'province', ]
         )
 
     def test_municipality_city_class_choices(self):
@@ -147,7 +148,7 @@ class ModelTestCase(TestCase):
     def test_barangay_fields_list(self):
         self.assertEqual(
             self.get_sorted_field_names(Barangay),
-            ['code', 'id', 'is_active', 'is_urban', 'municipality', 'name', 'population']
+            ['code', 'id', 'is_active', 'is_urban', 'latitude', 'longitude', 'municipality', 'name', 'population']
         )
 
     def test_barangay_province(self):
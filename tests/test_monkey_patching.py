@@ -26,8 +26,8 @@ class MonkeyPatchingTestCase(MigrationTest):
     """
     app_name = 'ph_geography'
     apps_after = None
-    before = '0001'
-    after = '0002'
+    before = '0004'
+    after = '0005'
 
     ADDED_FIELD_SPECIFIC = 'specific'
     ADDED_FIELD_ALL = 'all'
@@ -0,0 +1,90 @@
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import isolate_apps
+
+from ph_geography.models import Barangay
+from ph_geography.models import Municipality
+from ph_geography.models import PhilippineGeography
+from tests.utils import run_with_settings
+
+SAVE_SCRIPT = '''
+from ph_geography.models import Barangay, Municipality, Province, Region
+
+region = Region.objects.create(code='R', name='REGION', island_group='L')
+province = Province.objects.create(code='P', name='PROVINCE', region=region)
+municipality = Municipality(code='M', name='MUNICIPALITY', province=province)
+municipality.is_city = municipality.is_capital = False
+municipality.save()
+barangay = Barangay.objects.create(code='B', name='BARANGAY', municipality=municipality)
+print(sorted(field.name for field in Barangay._meta.concrete_fields))
+'''
+
+
+class OptionalFieldsTestCase(TestCase):
+    """
+    Test cases for django-ph-geography optional fields
+
+    Testing these cases:
+        * Excluding optional fields
+        * Field cache expiry
+        * Unknown and invalid field names
+        * Fields without null support
+        * Saving the provided models with the setting applied
+    """
+
+    @staticmethod
+    def get_sorted_field_names(model):
+        """Returns a sorted list of field names"""
+        return sorted([field.name for field in model._meta.get_fields()])
+
+    @isolate_apps('tests')
+    def test_include_optional_fields_result(self):
+        # Throwaway model in an isolated registry, since removed fields cannot be restored
+        class Place(PhilippineGeography):
+            class Meta:
+                app_label = 'tests'
+
+        # Populate field caches before removing fields
+        self.get_sorted_field_names(Place)
+        Place._meta.get_field('latitude')
+
+        Place.include_optional_fields('population')
+        self.assertEqual(self.get_sorted_field_names(Place), ['code', 'id', 'is_active', 'name', 'population'])
+        self.assertIsNone(Place().latitude)
+        self.assertEqual([field.name for field in Place._meta.concrete_fields],
+                         ['id', 'code', 'name', 'population', 'is_active'])
+
+    def test_include_optional_fields_not_found(self):
+        with self.assertRaises(ValueError):
+            Barangay.include_optional_fields('income_class')
+
+    def test_include_optional_fields_all_models_not_found(self):
+        with self.assertRaises(ValueError):
+            PhilippineGeography.include_optional_fields('code')
+
+    def test_include_optional_fields_params_not_str(self):
+        with self.assertRaises(TypeError):
+            PhilippineGeography.include_optional_fields('population', 123)
+
+    def test_include_optional_fields_not_null(self):
+        with self.assertRaises(ValueError):
+            Municipality.include_optional_fields()
+        self.assertTrue(Municipality._meta.get_field('latitude'))
+
+    def test_setting_provided_migrations(self):
+        returncode, output = run_with_settings('tests.settings_optional_fields', SAVE_SCRIPT)
+        self.assertEqual(returncode, 0, output)
+        self.assertIn("['code', 'id', 'is_active', 'municipality', 'name']", output)
+
+    @override_settings(PH_GEOGRAPHY_OPTIONAL_FIELDS=['population'])
+    def test_setting_provided_migrations_not_null(self):
+        with self.assertRaises(ImproperlyConfigured):
+            apps.get_app_config('ph_geography').ready()
+        self.assertTrue(Municipality._meta.get_field('is_city'))
+
+    def test_setting_own_migrations(self):
+        returncode, output = run_with_settings('tests.settings_without_optional_fields', SAVE_SCRIPT)
+        self.assertEqual(returncode, 0, output)
+        self.assertIn("['code', 'id', 'is_active', 'municipality', 'name']", output)
@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from ph_geography.models import Barangay
+from ph_geography.models import Municipality
+from ph_geography.models import Region
+from ph_geography.serializers import serialize
+from ph_geography.serializers import to_dict
+
+
+class SerializerTestCase(TestCase):
+    """
+    Test cases for django-ph-geography serializers
+
+    Testing these cases:
+        * to_dict() output of each level
+        * serialize() output matching to_dict()
+        * Shared parent dicts
+        * Single query
+    """
+    fixtures = ('geography.json',)
+
+    def setUp(self):
+        self.barangay = Barangay.objects.first()
+        Barangay.objects.create(code='BARANGAY', name='BARANGAY', municipality=self.barangay.municipality)
+
+    def test_to_dict_barangay(self):
+        data = to_dict(self.barangay)
+        self.assertEqual(sorted(data), ['code', 'island_group', 'municipality', 'name', 'province', 'region'])
+        self.assertEqual(data['region']['code'], self.barangay.region.code)
+        self.assertEqual(data['island_group'], self.barangay.island_group)
+
+    def test_to_dict_region(self):
+        region = Region.objects.first()
+        self.assertEqual(to_dict(region), {'code': region.code, 'name': region.name, 'island_group': region.island_group})
+
+    def test_to_dict_fields(self):
+        data = to_dict(self.barangay, fields=('code', 'population'))
+        self.assertEqual(data['population'], self.barangay.population)
+        self.assertNotIn('name', data)
+
+    def test_serialize_matches_to_dict(self):
+        for model in (Region, Municipality, Barangay):
+            queryset = model.objects.order_by('id')
+            self.assertEqual(serialize(queryset), [to_dict(instance) for instance in queryset])
+
+    def test_serialize_single_query(self):
+        with self.assertNumQueries(1):
+            serialize(Barangay.objects.all())
+
+    def test_serialize_shared_parents(self):
+        first, second = serialize(Barangay.objects.order_by('id'))
+        self.assertIs(first['municipality'], second['municipality'])
+        self.assertIs(first['region'], second['region'])
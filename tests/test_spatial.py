@@ -0,0 +1,103 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core import management
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ph_geography import spatial
+from ph_geography.index import clear_index
+from ph_geography.models import Barangay
+
+
+class SpatialTestCase(TestCase):
+    """
+    Test cases for django-ph-geography centroids and spatial lookups
+
+    Testing these cases:
+        * Custom command 'phgeocentroids'
+        * Nearest lookup
+        * Radius lookup
+        * Batch lookup
+    """
+    fixtures = ('geography.json',)
+
+    # Approximate coordinates of Quezon City and Manila
+    ORIGIN = (14.6760, 121.0437)
+    FAR = (14.5995, 120.9842)
+
+    def setUp(self):
+        clear_index()
+        self.tempdir = tempfile.mkdtemp()
+        barangay = Barangay.objects.order_by('id').first()
+        other = Barangay.objects.create(code='BARANGAY', name='BARANGAY', municipality=barangay.municipality)
+        self.barangays = [barangay, other]
+        rows = ['level,code,latitude,longitude']
+        for barangay, (latitude, longitude) in zip(self.barangays, (self.ORIGIN, self.FAR)):
+            rows.append('barangay,{},{},{}'.format(barangay.code, latitude, longitude))
+        rows.append('barangay,_,0,0')
+        self.path = self.write_file('\n'.join(rows))
+        management.call_command('phgeocentroids', self.path, verbosity=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def write_file(self, content):
+        """Write content to a temporary CSV file and return its path"""
+        path = os.path.join(self.tempdir, 'centroids.csv')
+        with io.open(path, 'wt', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_command_phgeocentroids(self):
+        barangay = Barangay.objects.get(pk=self.barangays[0].pk)
+        self.assertEqual((barangay.latitude, barangay.longitude), self.ORIGIN)
+
+    def test_command_phgeocentroids_invalid_level(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeocentroids', self.write_file('level,code,latitude,longitude\n_,_,0,0'),
+                                    verbosity=0)
+
+    def test_command_phgeocentroids_missing_columns(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeocentroids', self.write_file('level,code\n'), verbosity=0)
+
+    def test_command_phgeocentroids_out_of_range(self):
+        code = self.barangays[0].code
+        for latitude, longitude in (('95', '121'), ('14', '-181'), ('nan', '121'), ('14', 'inf')):
+            content = 'level,code,latitude,longitude\nbarangay,{},{},{}'.format(code, latitude, longitude)
+            with self.assertRaisesRegex(CommandError, 'line 2'):
+                management.call_command('phgeocentroids', self.write_file(content), verbosity=0)
+        self.assertEqual(len(spatial.nearest(self.ORIGIN[0], self.ORIGIN[1], 'barangay')), 1)
+
+    def test_command_phgeocentroids_file_not_found(self):
+        with self.assertRaises(CommandError):
+            management.call_command('phgeocentroids', os.path.join(self.tempdir, '_.csv'), verbosity=0)
+
+    def test_nearest(self):
+        results = spatial.nearest(self.ORIGIN[0] + 0.001, self.ORIGIN[1], 'barangay', k=2)
+        self.assertEqual([node.code for node, _ in results], [barangay.code for barangay in self.barangays])
+        self.assertLess(results[0][1], 1)
+
+    def test_nearest_no_centroids(self):
+        self.assertEqual(spatial.nearest(self.ORIGIN[0], self.ORIGIN[1], 'region'), [])
+
+    def test_within_radius(self):
+        results = spatial.within_radius(self.ORIGIN[0], self.ORIGIN[1], 5, 'barangay')
+        self.assertEqual([node.code for node, _ in results], [self.barangays[0].code])
+
+    def test_nearest_many(self):
+        results = list(spatial.nearest_many([self.ORIGIN, self.FAR], 'barangay'))
+        self.assertEqual([result[0][0].code for result in results], [barangay.code for barangay in self.barangays])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            spatial.nearest(91, 0, 'barangay')
+        with self.assertRaises(ValueError):
+            spatial.nearest(0, 0, '_')
+        with self.assertRaises(ValueError):
+            spatial.nearest(0, 0, 'barangay', k=0)
+        with self.assertRaises(ValueError):
+            spatial.within_radius(0, 0, -1, 'barangay')
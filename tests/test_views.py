@@ -0,0 +1,107 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+
+from ph_geography.index import bump_dataset_version
+from ph_geography.index import clear_index
+from ph_geography.index import get_dataset_version
+from ph_geography.index import get_index
+from ph_geography.models import DatasetVersion
+from ph_geography.models import Region
+
+
+class ViewTestCase(TestCase):
+    """
+    Test cases for django-ph-geography chained dropdown views
+
+    Testing these cases:
+        * JSON response of each level
+        * Unknown parent code
+        * ETag and Cache-Control headers
+        * Conditional GET
+        * Single index per request
+        * Index invalidation on model changes
+        * Index invalidation on shared dataset version changes
+    """
+    fixtures = ('geography.json',)
+
+    REGION_CODE = '130000000'
+    PROVINCE_CODE = '130000000'
+    MUNICIPALITY_CODE = '137404000'
+
+    def setUp(self):
+        clear_index()
+
+    def get_results(self, url):
+        """Returns a list of codes from the view response"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [item['code'] for item in json.loads(response.content.decode('utf-8'))['results']]
+
+    def test_regions(self):
+        self.assertEqual(self.get_results('/ph-geography/regions/'), [self.REGION_CODE])
+
+    def test_provinces(self):
+        url = '/ph-geography/regions/{}/provinces/'.format(self.REGION_CODE)
+        self.assertEqual(self.get_results(url), [self.PROVINCE_CODE])
+
+    def test_municipalities(self):
+        url = '/ph-geography/provinces/{}/municipalities/'.format(self.PROVINCE_CODE)
+        self.assertEqual(self.get_results(url), [self.MUNICIPALITY_CODE])
+
+    def test_barangays(self):
+        url = '/ph-geography/municipalities/{}/barangays/'.format(self.MUNICIPALITY_CODE)
+        self.assertTrue(self.get_results(url))
+
+    def test_unknown_parent(self):
+        response = self.client.get('/ph-geography/regions/_/provinces/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('max-age', response.get('Cache-Control', ''))
+
+    def test_index_resolved_once(self):
+        etag = self.client.get('/ph-geography/regions/')['ETag']
+        with mock.patch('ph_geography.views.get_index', side_effect=[get_index()]) as get_index_mock:
+            response = self.client.get('/ph-geography/regions/')
+        self.assertEqual(get_index_mock.call_count, 1)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cache_headers(self):
+        response = self.client.get('/ph-geography/regions/')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_conditional_get(self):
+        etag = self.client.get('/ph-geography/regions/')['ETag']
+        response = self.client.get('/ph-geography/regions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_update(self):
+        etag = self.client.get('/ph-geography/regions/')['ETag']
+        Region.objects.filter(code=self.REGION_CODE).get().save()
+        Region.objects.create(code='REGION', name='REGION', island_group=Region.ISLAND_GROUP_LUZON)
+        response = self.client.get('/ph-geography/regions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_on_dataset_version(self):
+        etag = self.client.get('/ph-geography/regions/')['ETag']
+        # Changes made by another process, without model signals
+        Region.objects.filter(code=self.REGION_CODE).update(name='REGION')
+        DatasetVersion.objects.update_or_create(pk=1, defaults={'token': 'other'})
+        response = self.client.get('/ph-geography/regions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        get_index().checked_at = 0
+        response = self.client.get('/ph-geography/regions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_bump_dataset_version(self):
+        index = get_index()
+        bump_dataset_version()
+        token = get_dataset_version()
+        self.assertTrue(token)
+        self.assertIsNot(get_index(), index)
+        bump_dataset_version()
+        self.assertNotEqual(get_dataset_version(), token)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+try:
+    from django.urls import include
+    from django.urls import re_path
+except ImportError:  # Django < 2.0
+    from django.conf.urls import include
+    from django.conf.urls import url as re_path
+
+urlpatterns = [
+    re_path(r'^admin/', admin.site.urls),
+    re_path(r'^ph-geography/', include('ph_geography.urls')),
+]
@@ -0,0 +1,27 @@
+import os
+import subprocess  # nosec
+import sys
+
+from django.conf import settings
+
+SETUP_SCRIPT = '''
+import django
+from django.core import management
+
+django.setup()
+management.call_command('migrate', run_syncdb=True, verbosity=0)
+'''
+
+
+def run_with_settings(settings_module, script):
+    """
+    Run a script in a new Python process with the given settings module and a migrated database.
+
+    App-ready customizations cannot be undone within the test process, so they are tested in a separate one.
+    Returns a tuple of (return code, output).
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    process = subprocess.Popen([sys.executable, '-c', SETUP_SCRIPT + script], cwd=settings.BASE_DIR, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)  # nosec
+    output = process.communicate()[0].decode('utf-8')
+    return process.returncode, output